@@ -0,0 +1,148 @@
+import os
+import json
+import tempfile
+import numpy as np
+from utils import cargar_json, guardar_json, huella_archivo, parsear_fecha, cache_por_archivo
+from estadisticas import matriz_de_sorteos, rangos_combinaciones, mascaras, construir_agregados, agregar_sorteo
+
+# Sidecar columnar de resultados.json: un .npy por columna dentro de
+# "<archivo>.columnas/" más un meta.json con la huella del JSON de origen.
+# Las columnas se abren con mmap_mode='r', así que abrir el almacén no
+# depende del tamaño del historial.
+COLUMNAS = {
+    "balotas": np.uint8,          # (n, 5), en el orden publicado; 0 = balota ausente
+    "numero": np.int32,
+    "fecha": "datetime64[D]",     # NaT si la fecha no se pudo interpretar
+    "acumulado": np.int64,
+    "total_ganadores": np.int32,
+    "rango": np.int32,            # rango lexicográfico de la jugada en C(39, 5); -1 si incompleta
+    "mascara": np.uint64,         # bit n encendido si salió la balota n
+    "orden": np.int32,            # índices de los sorteos ordenados por número
+}
+VERSION_COLUMNAS = 3
+
+def ruta_columnas(file_path):
+    return f"{os.path.splitext(file_path)[0]}.columnas"
+
+def _guardar_npy(ruta, arreglo):
+    # temporal único por escritura: el modo vigilancia y un análisis lanzado
+    # aparte pueden reconstruir las columnas a la vez
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp.npy")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.save(file, arreglo)
+        os.replace(tmp, ruta)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def construir_columnas(file_path):
+    sorteos = cargar_json(file_path).get("sorteos", [])
+    n = len(sorteos)
+
+    balotas = matriz_de_sorteos(sorteos)
+    fechas = [parsear_fecha(s.get("fecha")) for s in sorteos]
+    columnas = {
+        "balotas": balotas,
+        "numero": np.array([s["numero"] for s in sorteos], dtype=np.int32),
+        "fecha": np.array([f if f else "NaT" for f in fechas], dtype="datetime64[D]"),
+        "acumulado": np.array([s.get("acumulado", 0) for s in sorteos], dtype=np.int64),
+        "total_ganadores": np.array([s.get("total_ganadores", 0) for s in sorteos], dtype=np.int32),
+        "rango": rangos_combinaciones(np.sort(balotas, axis=1)).astype(np.int32),
+        "mascara": mascaras(balotas),
+    }
+    columnas["orden"] = np.argsort(columnas["numero"], kind="stable").astype(np.int32)
+
+    directorio = ruta_columnas(file_path)
+    os.makedirs(directorio, exist_ok=True)
+    for nombre, arreglo in columnas.items():
+        _guardar_npy(os.path.join(directorio, f"{nombre}.npy"), arreglo)
+    # meta.json se escribe al final: si existe y coincide, las columnas están completas
+    guardar_json(
+        {"huella": huella_archivo(file_path), "cantidad": n, "version": VERSION_COLUMNAS},
+        os.path.join(directorio, "meta.json"),
+    )
+
+def _huella_columnas(file_path):
+    try:
+        with open(os.path.join(ruta_columnas(file_path), "meta.json"), 'r') as file:
+            meta = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # columnas de otro formato se tratan como desactualizadas
+    return meta.get("huella") if meta.get("version") == VERSION_COLUMNAS else None
+
+@cache_por_archivo
+def cargar_columnas(file_path):
+    """
+    Devuelve {columna: np.memmap} para el historial, regenerando el sidecar
+    si el JSON cambió desde la última vez.
+    """
+    if _huella_columnas(file_path) != huella_archivo(file_path):
+        construir_columnas(file_path)
+
+    directorio = ruta_columnas(file_path)
+    return {
+        nombre: np.load(os.path.join(directorio, f"{nombre}.npy"), mmap_mode='r')
+        for nombre in COLUMNAS
+    }
+
+# Agregados materializados ("<archivo>.agregados.npz"): frecuencias, pares,
+# tripletas, paridad, rangos, última aparición... junto con la huella del
+# JSON a partir del cual se calcularon. Si la huella no coincide se
+# reconstruyen desde las columnas.
+VERSION_AGREGADOS = 3
+
+def ruta_agregados(file_path):
+    return f"{os.path.splitext(file_path)[0]}.agregados.npz"
+
+def guardar_npz(ruta, **arreglos):
+    # temporal único por escritura, como en _guardar_npy
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix=".tmp.npz")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(file, **arreglos)
+        os.replace(tmp, ruta)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def guardar_agregados(agregados, huella, file_path):
+    guardar_npz(ruta_agregados(file_path), huella=np.array(huella, dtype=np.int64),
+                version=VERSION_AGREGADOS, **agregados)
+
+def _leer_agregados(file_path):
+    try:
+        with np.load(ruta_agregados(file_path)) as npz:
+            datos = {k: npz[k] for k in npz.files}
+    except (FileNotFoundError, ValueError, OSError):
+        return None, None
+    # un sidecar de otro formato se trata como desactualizado
+    if datos.pop("version", None) != VERSION_AGREGADOS:
+        return None, None
+    return datos.pop("huella").tolist(), datos
+
+@cache_por_archivo
+def cargar_agregados(file_path):
+    huella, agregados = _leer_agregados(file_path)
+    if huella != huella_archivo(file_path):
+        columnas = cargar_columnas(file_path)
+        agregados = construir_agregados(columnas["balotas"], columnas["numero"])
+        guardar_agregados(agregados, huella_archivo(file_path), file_path)
+    return agregados
+
+def actualizar_agregados(file_path, huella_anterior, nuevos):
+    """
+    Suma al sidecar los sorteos recién agregados al final del JSON. Si el
+    sidecar no correspondía a la versión anterior del JSON no se toca: la
+    huella ya no coincide y se reconstruirá en la próxima lectura.
+    """
+    huella, agregados = _leer_agregados(file_path)
+    if huella is None or huella != huella_anterior:
+        return False
+    for sorteo in nuevos:
+        agregar_sorteo(agregados, sorteo.get("balotas", []), sorteo["numero"])
+    guardar_agregados(agregados, huella_archivo(file_path), file_path)
+    return True
@@ -1,11 +1,25 @@
-from collections import Counter
-from collections import defaultdict
-from itertools import combinations
-from utils import cargar_json, seed_por_archivo
+from utils import cargar_json, seed_por_archivo, cache_por_archivo
+from almacen import cargar_columnas, cargar_agregados
+from metricas import medir, instrumentar_modulo
+from estadisticas import (
+    orden_counter,
+    combinaciones,
+    rango_combinacion,
+    combinacion_de_rango,
+    total_combinaciones,
+    mascara_de,
+    filtrar_combinaciones,
+    caracteristicas_combinaciones,
+    popcount,
+    ausencias,
+    top_compañeros,
+    top_compañeros_todos,
+    numero_mas_frecuente,
+)
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import random
+from functools import lru_cache
 
 def tiene_consecutivos(nums) -> bool:
     s = set(nums)
@@ -14,174 +28,224 @@ def tiene_consecutivos(nums) -> bool:
 def suma_cerca_de_objetivo(nums, objetivo=100, tolerancia=10) -> bool:
     return abs(sum(nums) - objetivo) <= tolerancia
 
-def co_ocurrencia_de_numeros(file_path):
-    data = cargar_json(file_path)
-    sorteos = data.get("sorteos", [])
+def obtener_agregados(file_path):
+    return cargar_agregados(file_path)
 
-    coocurrencias = defaultdict(lambda: defaultdict(int))
+def _motor_de_agregados(ag):
+    # la matriz de co-ocurrencia vive en los agregados y alimenta todas las vistas
+    return {
+        "matriz": ag["coocurrencia"],
+        "primera_numero": ag["primera_numero"],
+        "primera_par": ag["primera_par"],
+    }
 
-    for sorteo in sorteos:
-        balotas = sorteo.get("balotas", [])
-        for i in range(len(balotas)):
-            for j in range(len(balotas)):
-                if i != j:
-                    coocurrencias[balotas[i]][balotas[j]] += 1
+def obtener_motor_coocurrencia(file_path):
+    return _motor_de_agregados(obtener_agregados(file_path))
 
-    resultado = {}
-    for numero, co in coocurrencias.items():
-        ordenado = sorted(co.items(), key=lambda x: x[1], reverse=True)
-        resultado[numero] = ordenado[:5]  # Top 5 compañeros - OJO: no precisamente deben ser las más comunes en general
+def co_ocurrencia_de_numeros(file_path, k=5):
+    return _co_ocurrencia(obtener_motor_coocurrencia(file_path), k)
 
-    return resultado
+def _co_ocurrencia(motor, k=5):
+    M = motor["matriz"]
+    con_compañeros = np.flatnonzero(M.sum(axis=1) - np.diag(M))
+    orden = con_compañeros[np.argsort(motor["primera_numero"][con_compañeros], kind="stable")]
+    # Top k compañeros - OJO: no precisamente deben ser las más comunes en general
+    compañeros, conteos = top_compañeros_todos(motor, k)
+    compañeros, conteos = compañeros.tolist(), conteos.tolist()
+    return {
+        int(n): [(c, v) for c, v in zip(compañeros[n], conteos[n]) if v]
+        for n in orden
+    }
 
 def co_ocurrencias_del_numero_mas_frecuente(file_path):
-    data = cargar_json(file_path)
-    sorteos = data.get("sorteos", [])
+    motor = obtener_motor_coocurrencia(file_path)
+    numero_principal = numero_mas_frecuente(motor)
 
-    balotas = [num for sorteo in sorteos for num in sorteo.get("balotas", [])]
-    frecuencia = Counter(balotas)
-
-    numero_principal, _ = frecuencia.most_common(1)[0]
-
-    coocurrencias = Counter()
-    for sorteo in sorteos:
-        balotas = sorteo.get("balotas", [])
-        if numero_principal in balotas:
-            for num in balotas:
-                if num != numero_principal:
-                    coocurrencias[num] += 1
-
-    # Paso 4: devolver el resultado
     return {
         "numero_principal": numero_principal,
-        "coocurrencias": coocurrencias.most_common(5)
+        "coocurrencias": top_compañeros(motor, numero_principal, 5)
     }
 
 
+@cache_por_archivo
 def obtener_balotas(file_path):
     data = cargar_json(file_path)
-    return [s["balotas"] for s in data.get("sorteos", [])]
+    return tuple(s["balotas"] for s in data.get("sorteos", []))
+
+def _frecuencias_ordenadas(file_path, ascendente=False):
+    ag = obtener_agregados(file_path)
+    conteos = ag["frecuencia"]
+    return [(int(n), int(conteos[n])) for n in orden_counter(conteos, ag["primera_numero"], ascendente)]
 
 def numeros_mas_frecuentes(file_path):
-    balotas = [num for juego in obtener_balotas(file_path) for num in juego]
-    frecuencia = Counter(balotas)
-    return frecuencia.most_common(10)
+    return _frecuencias_ordenadas(file_path)[:10]
 
 def numeros_menos_frecuentes(file_path):
-    balotas = [num for juego in obtener_balotas(file_path) for num in juego]
-    frecuencia = Counter(balotas)
-    return sorted(frecuencia.items(), key=lambda x: x[1])[:10]
+    return _frecuencias_ordenadas(file_path, ascendente=True)[:10]
 
 def promedio_por_sorteo(file_path):
-    balotas = obtener_balotas(file_path)
-    promedios = [sum(juego) / len(juego) for juego in balotas]
-    return round(sum(promedios) / len(promedios), 2)
+    ag = obtener_agregados(file_path)
+    return round(float(ag["suma_promedios"]) / int(ag["cantidad"]), 2)
 
 def diferencia_mayor_menor(file_path):
-    balotas = obtener_balotas(file_path)
-    diferencias = [max(j) - min(j) for j in balotas]
+    ag = obtener_agregados(file_path)
     return {
-        "promedio": round(sum(diferencias) / len(diferencias), 2),
-        "minima": min(diferencias),
-        "maxima": max(diferencias)
+        "promedio": round(int(ag["suma_diferencias"]) / int(ag["cantidad"]), 2),
+        "minima": int(ag["diferencia_minima"]),
+        "maxima": int(ag["diferencia_maxima"])
     }
 
 def conteo_pares_impares(file_path):
-    balotas = [num for juego in obtener_balotas(file_path) for num in juego]
-    pares = sum(1 for n in balotas if n % 2 == 0)
-    impares = len(balotas) - pares
+    conteos = obtener_agregados(file_path)["frecuencia"]
+    pares = int(conteos[2::2].sum())
+    impares = int(conteos[1::2].sum())
     return {"pares": pares, "impares": impares}
 
 def conteo_por_rangos(file_path):
-    rangos = {"1-10": 0, "11-20": 0, "21-30": 0, "31-40": 0}
-    balotas = [num for juego in obtener_balotas(file_path) for num in juego]
-    for n in balotas:
-        if 1 <= n <= 10:
-            rangos["1-10"] += 1
-        elif 11 <= n <= 20:
-            rangos["11-20"] += 1
-        elif 21 <= n <= 30:
-            rangos["21-30"] += 1
-        elif 31 <= n <= 40:
-            rangos["31-40"] += 1
-    return rangos
-
-def pares_mas_comunes(file_path):
-    juegos = obtener_balotas(file_path)
-    pares = Counter()
-    for j in juegos:
-        pares.update(combinations(sorted(j), 2))
-    return pares.most_common(5)
-
-def tripletas_mas_comunes(file_path):
-    juegos = obtener_balotas(file_path)
-    tripletas = Counter()
-    for j in juegos:
-        tripletas.update(combinations(sorted(j), 3))
-    return tripletas.most_common(5)
-
-def numeros_repetidos_entre_sorteos(file_path):
-    juegos = obtener_balotas(file_path)
-    repeticiones = 0
-    total_comparaciones = 0
-    for i in range(1, len(juegos)):
-        anterior = set(juegos[i-1])
-        actual = set(juegos[i])
-        repeticiones += len(anterior.intersection(actual))
-        total_comparaciones += 1
+    rangos = obtener_agregados(file_path)["rangos"]
+    return dict(zip(["1-10", "11-20", "21-30", "31-40"], (int(c) for c in rangos)))
+
+def _mas_comunes(conteos, primera, k, top, minimo):
+    # rango lexicográfico -> tupla ordenada de k balotas
+    tabla = combinaciones(k)
+    orden = orden_counter(np.where(conteos >= minimo, conteos, 0), primera, top=top)
+    return [(tuple(int(n) for n in tabla[r]), int(conteos[r])) for r in orden]
+
+def pares_mas_comunes(file_path, top=5, minimo=1):
+    ag = obtener_agregados(file_path)
+    return _mas_comunes(ag["pares"], ag["primera_pareja"], 2, top, minimo)
+
+def tripletas_mas_comunes(file_path, top=5, minimo=1):
+    ag = obtener_agregados(file_path)
+    return _mas_comunes(ag["tripletas"], ag["primera_tripleta"], 3, top, minimo)
+
+def numeros_repetidos_entre_sorteos(file_path, desfase=1):
+    if desfase < 1:
+        raise ValueError(f"El desfase debe ser al menos 1 (se recibió {desfase}).")
+    if desfase == 1:
+        ag = obtener_agregados(file_path)
+        repeticiones = int(ag["repeticiones"])
+        total_comparaciones = int(ag["cantidad"]) - 1
+    else:
+        # sorteo i contra sorteo i - desfase: AND de máscaras + popcount
+        m = cargar_columnas(file_path)["mascara"]
+        repeticiones = int(popcount(m[desfase:] & m[:-desfase]).sum(dtype=np.int64))
+        total_comparaciones = len(m) - desfase
+    if total_comparaciones < 1:
+        raise ValueError(
+            f"El desfase debe ser menor que la cantidad de sorteos ({total_comparaciones + desfase})."
+        )
     promedio = round(repeticiones / total_comparaciones, 2)
     return {
         "repeticiones_totales": repeticiones,
         "promedio_por_sorteo": promedio
     }
 
+def coincidencias_con_historial(file_path, ticket):
+    """Cuántos sorteos del historial comparten 0, 1, ..., 5 números con `ticket`."""
+    m = cargar_columnas(file_path)["mascara"]
+    aciertos = popcount(m & mascara_de(ticket))
+    return [int(np.count_nonzero(aciertos == k)) for k in range(6)]
+
+def conteo_combinaciones_completas(file_path):
+    # histograma sobre las 575757 jugadas posibles, indexado por rango
+    rangos = cargar_columnas(file_path)["rango"]
+    return np.bincount(rangos[rangos >= 0], minlength=total_combinaciones(5))
+
 def combinaciones_completas_mas_comunes(file_path):
-    balotas = obtener_balotas(file_path)
-    combinaciones = Counter(tuple(sorted(jugada)) for jugada in balotas)
-    combinaciones_repetidas = [ (list(k), v) for k, v in combinaciones.items() if v > 1 ]
-    return sorted(combinaciones_repetidas, key=lambda x: x[1], reverse=True)
+    rangos = np.asarray(cargar_columnas(file_path)["rango"])
+    conteos = conteo_combinaciones_completas(file_path)
+    repetidas = np.flatnonzero(conteos > 1)
+    if not len(repetidas):
+        return []
+    # desempate por primera aparición, como el Counter original
+    unicos, primera = np.unique(rangos, return_index=True)
+    primera = primera[np.searchsorted(unicos, repetidas)]
+    orden = repetidas[np.lexsort((primera, -conteos[repetidas]))]
+    return [(combinacion_de_rango(int(r), 5), int(conteos[r])) for r in orden]
+
+def ticket_ya_salio(file_path, ticket):
+    """Números de los sorteos en los que salió exactamente `ticket` (en cualquier orden)."""
+    columnas = cargar_columnas(file_path)
+    coincide = np.asarray(columnas["rango"]) == rango_combinacion(ticket)
+    return [int(n) for n in columnas["numero"][coincide]]
 
 def numeros_que_no_han_salido(file_path, ultimos_n=10):
-    data = cargar_json(file_path)
-    sorteos = sorted(data.get("sorteos", []), key=lambda x: x["numero"], reverse=True)
-    recientes = sorteos[:ultimos_n]
+    # frío en los últimos N <=> nunca salió o lleva al menos N sorteos sin salir
+    return [n for n, gap in ausencias(obtener_agregados(file_path)).items() if gap is None or gap >= ultimos_n]
 
-    numeros_salidos = set()
-    for sorteo in recientes:
-        numeros_salidos.update(sorteo.get("balotas", []))
+def ranking_de_ausencias(file_path):
+    """Números ordenados de mayor a menor ausencia actual (los que nunca salieron primero)."""
+    gaps = ausencias(obtener_agregados(file_path))
+    return sorted(gaps.items(), key=lambda x: (x[1] is not None, -(x[1] or 0)))
 
-    universo = set(range(1, 40))
-    numeros_frios = sorted(universo - numeros_salidos)
-    return numeros_frios
+def tabla_de_horizontes(file_path):
+    """
+    Números fríos para todos los horizontes a la vez: cada fila cubre los N
+    entre "desde" y "hasta" con el mismo conjunto de números sin salir.
+    """
+    gaps = ausencias(obtener_agregados(file_path))
+    nunca = [n for n, g in gaps.items() if g is None]
+    cortes = sorted({g for g in gaps.values() if g})
+    filas, desde = [], 1
+    for hasta in cortes:
+        filas.append({
+            "desde": desde,
+            "hasta": hasta,
+            "numeros": sorted(nunca + [n for n, g in gaps.items() if g is not None and g >= hasta]),
+        })
+        desde = hasta + 1
+    if nunca:
+        filas.append({"desde": desde, "hasta": None, "numeros": nunca})
+    return filas
 
 def ranking_de_numeros(file_path):
-    frecuencias = dict(Counter([n for jugada in obtener_balotas(file_path) for n in jugada]))
-    co_ocurrencias_generales = co_ocurrencia_de_numeros(file_path)
+    motor = obtener_motor_coocurrencia(file_path)
+    frecuencias = np.diag(motor["matriz"])
 
     score = {}
     for n in range(1, 40):
-            freq = frecuencias.get(n, 0)
+            freq = int(frecuencias[n])
 
-            cooc = sum(v for num, v in co_ocurrencias_generales.get(n, []))
+            cooc = sum(v for num, v in top_compañeros(motor, n, 5))
 
             score[n] = (freq * 1.0) + (cooc * 0.2)
 
     return sorted(score.items(), key=lambda x: x[1], reverse=True)
 
 def ranking_de_numeros_correlacion_prioritaria(file_path):
-    frecuencias = dict(Counter([n for jugada in obtener_balotas(file_path) for n in jugada]))
-    cooc_puntero_data = co_ocurrencias_del_numero_mas_frecuente(file_path)
-    cooc_puntero = dict(cooc_puntero_data["coocurrencias"])
+    return _ranking_correlacion(obtener_motor_coocurrencia(file_path))
+
+def _ranking_correlacion(motor):
+    frecuencias = np.diag(motor["matriz"])
+    cooc_puntero = dict(top_compañeros(motor, numero_mas_frecuente(motor), 5))
 
     score = {}
     for n in range(1, 40):
-        freq = frecuencias.get(n, 0)
+        freq = int(frecuencias[n])
 
         score_cooc_puntero = cooc_puntero.get(n, 0)
         score[n] = (freq * 1.0) + (score_cooc_puntero * 0.5)
 
     return sorted(score.items(), key=lambda x: x[1], reverse=True)
 
+def entradas_estrategias(file_path):
+    """Datos que comparten los generadores de tickets, calculados una sola vez."""
+    entradas = entradas_de_agregados(obtener_agregados(file_path))
+    entradas["semilla"] = seed_por_archivo(file_path)
+    return entradas
+
+def entradas_de_agregados(ag):
+    # lo mismo que entradas_estrategias pero a partir de agregados en memoria
+    # (el backtest los va actualizando sorteo a sorteo)
+    motor = _motor_de_agregados(ag)
+    return {
+        "ranking": [num for num, _ in _ranking_correlacion(motor)],
+        "cooc_top5": _co_ocurrencia(motor),
+        "top_pares": [list(p[0]) for p in _mas_comunes(ag["pares"], ag["primera_pareja"], 2, 5, 1)],
+        "top_tripletas": [list(t[0]) for t in _mas_comunes(ag["tripletas"], ag["primera_tripleta"], 3, 5, 1)],
+    }
+
 def generar_jugadas_optimas(file_path, cantidad=5):
     ranking = [num for num, _ in ranking_de_numeros(file_path)]
     ranking_pos = {n: i for i, n in enumerate(ranking)}
@@ -190,79 +254,77 @@ def generar_jugadas_optimas(file_path, cantidad=5):
         jugadas.append(sorted(ranking[i*5:(i+1)*5]))
     return jugadas
 
-def generar_jugadas_optimas_v2(file_path, cantidad=5):
-    ranking = [num for num, _ in ranking_de_numeros_correlacion_prioritaria(file_path)]
-
+@medir("tickets.optimas_v2")
+def _jugada_optima_v2(ranking, rng):
     top_calientes = ranking[:10]
     medio = ranking[10:-10]
     bottom_frios = ranking[-10:]
 
-    jugadas = []
-    for _ in range(cantidad):
-        jugada = set()
+    jugada = set()
 
-        # 2 Calientes (Top 10)
-        jugada.update(random.sample(top_calientes, 2))
+    # 2 Calientes (Top 10)
+    jugada.update(rng.sample(top_calientes, 2))
 
-        # 2 Medios
-        jugada.update(random.sample(medio, 2))
+    # 2 Medios
+    jugada.update(rng.sample(medio, 2))
 
-        # 1 Frío (Bottom 10)
-        jugada.add(random.choice(bottom_frios))
+    # 1 Frío (Bottom 10)
+    jugada.add(rng.choice(bottom_frios))
 
-        # En caso de que se repita un número (casi imposible), ajustamos.
-        while len(jugada) < 5:
-            jugada.add(random.choice(ranking))
+    # En caso de que se repita un número (casi imposible), ajustamos.
+    while len(jugada) < 5:
+        jugada.add(rng.choice(ranking))
 
-        jugadas.append(sorted(list(jugada)))
-
-    return jugadas
-
-def generar_jugadas_por_patrones(file_path, cantidad=5):
-    """
-    Genera jugadas tomando los Pares y Tripletas más comunes y
-    completando la jugada con números fríos para el balance.
-    """
+    return sorted(list(jugada))
 
+def generar_jugadas_optimas_v2(file_path, cantidad=5, rng=random):
     ranking = [num for num, _ in ranking_de_numeros_correlacion_prioritaria(file_path)]
+    return [_jugada_optima_v2(ranking, rng) for _ in range(cantidad)]
 
-    # Obtener patrones calientes
-    top_pares = [list(p[0]) for p in pares_mas_comunes(file_path)]
-    top_tripletas = [list(t[0]) for t in tripletas_mas_comunes(file_path)]
-
+@medir("tickets.patrones")
+def _jugada_por_patrones(ranking, top_pares, top_tripletas, i, rng):
     # Obtener números fríos (los menos rankeados o que no han salido)
     frios_del_ranking = ranking[-10:] # Los 10 números menos probables según el ranking
 
-    jugadas = []
+    jugada = set()
 
-    for i in range(cantidad):
-        jugada = set()
+    if i % 2 == 0 and top_tripletas:
+        tripleta = top_tripletas[i % len(top_tripletas)]
+        jugada.update(tripleta)
 
-        if i % 2 == 0 and top_tripletas:
-            tripleta = top_tripletas[i % len(top_tripletas)]
-            jugada.update(tripleta)
+        complemento = rng.sample(frios_del_ranking, min(2, len(frios_del_ranking)))
+        jugada.update(complemento)
 
-            complemento = random.sample(frios_del_ranking, min(2, len(frios_del_ranking)))
-            jugada.update(complemento)
+    elif top_pares:
+        par = top_pares[i % len(top_pares)]
+        jugada.update(par)
 
-        elif top_pares:
-            par = top_pares[i % len(top_pares)]
-            jugada.update(par)
+        media_fria = ranking[15:]
+        complemento = rng.sample(media_fria, min(3, len(media_fria)))
+        jugada.update(complemento)
 
-            media_fria = ranking[15:]
-            complemento = random.sample(media_fria, min(3, len(media_fria)))
-            jugada.update(complemento)
+    while len(jugada) < 5:
+        jugada.add(rng.choice(ranking))
 
-        while len(jugada) < 5:
-            jugada.add(random.choice(ranking))
+    jugada = {n for n in jugada if 1 <= n <= 39}
+    while len(jugada) < 5:
+        jugada.add(rng.randint(1, 39))
 
-        jugada = {n for n in jugada if 1 <= n <= 39}
-        while len(jugada) < 5:
-            jugada.add(random.randint(1, 39))
+    return sorted(list(jugada))
 
-        jugadas.append(sorted(list(jugada)))
+def generar_jugadas_por_patrones(file_path, cantidad=5, rng=random):
+    """
+    Genera jugadas tomando los Pares y Tripletas más comunes y
+    completando la jugada con números fríos para el balance.
+    """
 
-    return jugadas
+    ranking = [num for num, _ in ranking_de_numeros_correlacion_prioritaria(file_path)]
+
+    # Obtener patrones calientes
+    top_pares = [list(p[0]) for p in pares_mas_comunes(file_path)]
+    top_tripletas = [list(t[0]) for t in tripletas_mas_comunes(file_path)]
+
+    return [_jugada_por_patrones(ranking, top_pares, top_tripletas, i, rng) for i in range(cantidad)]
 
 def generar_jugadas_por_patrones_determinista(file_path, cantidad=5):
     """
@@ -364,6 +426,11 @@ def generar_ticket_estrategia_15_old(file_path):
     rng = random.Random(seed_por_archivo(file_path) + 15)
 
     ranking = [num for num, _ in ranking_de_numeros_correlacion_prioritaria(file_path)]
+    cooc_top5 = co_ocurrencia_de_numeros(file_path)  # {n: [(comp, veces), ...]}
+    return _ticket_15_old(ranking, cooc_top5, rng)
+
+@medir("tickets.15_old")
+def _ticket_15_old(ranking, cooc_top5, rng):
     ranking_pos = {n: i for i, n in enumerate(ranking)}
     top_calientes = ranking[:10]
 
@@ -427,8 +494,6 @@ def generar_ticket_estrategia_15_old(file_path):
         pares = rng.sample([n for n in range(1, 40) if n % 2 == 0], 2)
         return sorted(impares + pares)
 
-    cooc_top5 = co_ocurrencia_de_numeros(file_path)  # {n: [(comp, veces), ...]}
-
     for _ in range(400):
         jugada = set()
 
@@ -477,164 +542,82 @@ def generar_ticket_estrategia_15_new(file_path, suma_objetivo=100, tolerancia=10
     """
     Estrategia #15 (1 ticket) - refinada:
     - semilla de top calientes (preferir impar)
-    - 2 cooc ponderados por frecuencia (no siempre los 2 primeros)
-    - completar con ranking (peso suave)
+    - cooc de la semilla ponderados por frecuencia
+    - resto ponderado por ranking (peso suave)
 
     Reglas:
     - Dura: 3 impares + 2 pares
-    - Suave: >=2 rangos (1-13, 14-26, 27-39)
-    - Dura (nueva): NO consecutivos (x y x+1)
-    - Dura (nueva): suma cerca de suma_objetivo (|sum-objetivo|<=tolerancia)
+    - Dura: >=2 rangos (1-13, 14-26, 27-39)
+    - Dura: NO consecutivos (x y x+1)
+    - Dura: suma cerca de suma_objetivo (|sum-objetivo|<=tolerancia)
+
+    En vez de probar jugadas al azar hasta que una cumpla, las reglas se
+    aplican como máscara sobre la tabla de las 575757 combinaciones y se
+    sortea entre las que sobreviven.
     """
-    rng = random.Random(seed_por_archivo(file_path) + 15)
+    rng = np.random.default_rng(seed_por_archivo(file_path) + 15)
 
     ranking = [num for num, _ in ranking_de_numeros_correlacion_prioritaria(file_path)]
-    ranking_pos = {n: i for i, n in enumerate(ranking)}
-    top_calientes = ranking[:10]
-
     cooc_top5 = co_ocurrencia_de_numeros(file_path)  # {n: [(comp, veces), ...]}
 
-    def rango_bucket(n: int) -> int:
-        if n <= 13: return 0
-        if n <= 26: return 1
-        return 2
-
-    def paridad_ok(nums) -> bool:
-        return sum(1 for x in nums if x % 2 == 1) == 3
-
-    def rangos_ok(nums) -> bool:
-        return len({rango_bucket(x) for x in nums}) >= 2
-
-    def suma_ok(nums) -> bool:
-        return suma_cerca_de_objetivo(nums, objetivo=suma_objetivo, tolerancia=tolerancia)
-
-    def no_consecutivos_ok(nums) -> bool:
-        return not tiene_consecutivos(nums)
-
-    def cooc_seed(candidatos) -> int:
-        if not candidatos:
-            return ranking[0] if ranking else rng.randint(1, 39)
-
-        def score(n):
-            return sum(v for _, v in cooc_top5.get(n, [])[:5])
-        return max(candidatos, key=score)
-
-    def candidatos_otro_rango(jugada, candidatos):
-        buckets = {rango_bucket(x) for x in jugada}
-        if len(buckets) >= 2:
-            return candidatos
-        bucket_actual = next(iter(buckets))
-        otros = [n for n in candidatos if rango_bucket(n) != bucket_actual]
-        return otros if otros else candidatos
-
-    def weighted_pick(candidatos):
-        pesos = [1 / math.sqrt(1 + ranking_pos.get(n, 999)) for n in candidatos]
-        return rng.choices(candidatos, weights=pesos, k=1)[0]
-
-    def elegir_candidato(candidatos, jugada):
-        impares_actual = sum(1 for x in jugada if x % 2 == 1)
-        pares_actual = len(jugada) - impares_actual
-
-        impares_necesarios = 3 - impares_actual
-        pares_necesarios = 2 - pares_actual
-
-        if impares_necesarios <= 0 and pares_necesarios > 0:
-            candidatos = [n for n in candidatos if n % 2 == 0]
-        elif pares_necesarios <= 0 and impares_necesarios > 0:
-            candidatos = [n for n in candidatos if n % 2 == 1]
-
-        if not candidatos:
-            return None
-
-        if len(jugada) >= 3:
-            candidatos = candidatos_otro_rango(jugada, candidatos)
-
-        # 🚫 filtro anti-consecutivos mientras construye (para no cagarla al final)
-        candidatos = [n for n in candidatos if (n - 1) not in jugada and (n + 1) not in jugada]
-        if not candidatos:
-            return None
-
-        return weighted_pick(candidatos)
-
-    # fallback si ranking vacío
-    if not ranking:
-        for _ in range(15000):
-            impares = rng.sample([n for n in range(1, 40) if n % 2 == 1], 3)
-            pares = rng.sample([n for n in range(1, 40) if n % 2 == 0], 2)
-            jug = sorted(impares + pares)
-            if rangos_ok(jug) and no_consecutivos_ok(jug) and suma_ok(jug):
-                return jug
-        # último último
-        impares = rng.sample([n for n in range(1, 40) if n % 2 == 1], 3)
-        pares = rng.sample([n for n in range(1, 40) if n % 2 == 0], 2)
-        return sorted(impares + pares)
-
-    # más intentos porque ahora hay 2 reglas duras extra
-    for _ in range(15000):
-        jugada = set()
-
-        # semilla preferir impar
-        top_impares = [n for n in top_calientes if n % 2 == 1]
-        semilla = cooc_seed(top_impares or top_calientes)
-        jugada.add(semilla)
-
-        # agregar hasta 2 cooc, ponderados por frecuencia, evitando consecutivos
-        comps_raw = [(c, v) for c, v in cooc_top5.get(semilla, []) if 1 <= c <= 39 and c != semilla]
-        if comps_raw:
-            comps = [c for c, _ in comps_raw if c not in jugada and (c - 1) not in jugada and (c + 1) not in jugada]
-            weights = [v for c, v in comps_raw if c not in jugada and (c - 1) not in jugada and (c + 1) not in jugada]
-
-            while len(jugada) < 3 and comps:
-                c = rng.choices(comps, weights=weights, k=1)[0]
-
-                tmp = jugada | {c}
-                imp = sum(1 for x in tmp if x % 2 == 1)
-                par = len(tmp) - imp
-                if imp <= 3 and par <= 2:
-                    jugada.add(c)
-
-                idx = comps.index(c)
-                comps.pop(idx)
-                weights.pop(idx)
-
-        # completar hasta 5 con ranking y luego universo
-        while len(jugada) < 5:
-            candidatos = [n for n in ranking[:30] if n not in jugada] \
-                         or [n for n in ranking if n not in jugada] \
-                         or [n for n in range(1, 40) if n not in jugada]
-
-            cand = elegir_candidato(candidatos, jugada)
-            if cand is None:
-                break
-            jugada.add(cand)
-
-        if len(jugada) != 5:
-            continue
-
-        jugada = sorted(jugada)
-
-        # ✅ filtros finales
-        if (
-            paridad_ok(jugada)
-            and rangos_ok(jugada)
-            and no_consecutivos_ok(jugada)
-            and suma_ok(jugada)
-        ):
-            return jugada
-
-    # fallback final: intenta cumplir reglas
-    for _ in range(5000):
-        impares = rng.sample([n for n in range(1, 40) if n % 2 == 1], 3)
-        pares = rng.sample([n for n in range(1, 40) if n % 2 == 0], 2)
-        jug = sorted(impares + pares)
-        if rangos_ok(jug) and no_consecutivos_ok(jug) and suma_ok(jug):
-            return jug
+    jugadas, probabilidades = _candidatas_15_new(ranking, cooc_top5, suma_objetivo, tolerancia)
+    return [int(n) for n in jugadas[rng.choice(len(jugadas), p=probabilidades)]]
+
+@lru_cache(maxsize=None)
+def _factibles_15_new(suma_objetivo, tolerancia):
+    # las reglas fijas de la estrategia no dependen del historial
+    factibles = np.flatnonzero(filtrar_combinaciones(
+        impares=3, min_rangos=2, sin_consecutivos=True,
+        suma_objetivo=suma_objetivo, tolerancia=tolerancia,
+    ))
+    factibles.setflags(write=False)
+    return factibles
+
+@medir("tickets.15_new")
+def _candidatas_15_new(ranking, cooc_top5, suma_objetivo, tolerancia):
+    # jugadas factibles de la estrategia 15 NEW y su probabilidad de ser elegidas
+    ranking_pos = {n: i for i, n in enumerate(ranking)}
+    top_calientes = ranking[:10]
 
-    # ya si no, lo que sea (rarísimo)
-    impares = rng.sample([n for n in range(1, 40) if n % 2 == 1], 3)
-    pares = rng.sample([n for n in range(1, 40) if n % 2 == 0], 2)
-    return sorted(impares + pares)
+    factibles = _factibles_15_new(suma_objetivo, tolerancia)
+    if not len(factibles):
+        raise ValueError(
+            f"Ninguna jugada cumple las reglas con suma {suma_objetivo} ± {tolerancia}."
+        )
+
+    # semilla preferir impar, la de mayor fuerza de cooc (suma top5)
+    top_impares = [n for n in top_calientes if n % 2 == 1]
+    semilla = max(top_impares or top_calientes, key=lambda n: sum(v for _, v in cooc_top5.get(n, [])[:5]))
+    comps = {c: v for c, v in cooc_top5.get(semilla, []) if c != semilla}
+
+    mascaras_factibles = caracteristicas_combinaciones()["mascara"][factibles]
+    contiene_semilla = (mascaras_factibles & mascara_de([semilla])) != 0
+    contiene_comp = (mascaras_factibles & mascara_de(comps)) != 0
+
+    # preferencia de la estrategia, relajándola si deja el conjunto vacío
+    for preferidas in (contiene_semilla & contiene_comp, contiene_semilla, None):
+        candidatas = factibles if preferidas is None else factibles[preferidas]
+        if len(candidatas):
+            break
+
+    peso_ranking = np.array([1 / math.sqrt(1 + ranking_pos.get(n, 999)) for n in range(40)])
+    peso_cooc = np.zeros(40)
+    total_cooc = sum(comps.values())
+    for c, v in comps.items():
+        peso_cooc[c] = v / total_cooc
+    jugadas = combinaciones(5)[candidatas]
+    pesos = peso_ranking[jugadas].prod(axis=1) * (1 + peso_cooc[jugadas].sum(axis=1))
+    return jugadas, pesos / pesos.sum()
 
 def generar_ticket_estrategia_15(file_path):
-    print("Jugada 15 OLD: ", generar_ticket_estrategia_15_old(file_path))
-    print("Jugada 15 NEW: ", generar_ticket_estrategia_15_new(file_path))
\ No newline at end of file
+    tickets = {"15 OLD": generar_ticket_estrategia_15_old(file_path)}
+    print("Jugada 15 OLD: ", tickets["15 OLD"])
+    try:
+        tickets["15 NEW"] = generar_ticket_estrategia_15_new(file_path)
+        print("Jugada 15 NEW: ", tickets["15 NEW"])
+    except ValueError as e:
+        print(f"Jugada 15 NEW: {e}")
+    return tickets
+
+# cronometra cada análisis público (solo con MILOTO_METRICAS activo)
+instrumentar_modulo(globals(), "analisis")
@@ -0,0 +1,127 @@
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from almacen import cargar_columnas
+from utils import seed_por_archivo
+from estadisticas import construir_agregados, agregar_sorteo, mascaras, popcount
+from analisis import (
+    entradas_de_agregados,
+    _ticket_15_old,
+    _candidatas_15_new,
+    _jugada_optima_v2,
+    _jugada_por_patrones,
+)
+from lotes import ESTRATEGIAS
+
+# Backtest "walk-forward": se recorre el historial en orden de número de
+# sorteo, los agregados (frecuencias, co-ocurrencia, pares, tripletas) se
+# actualizan sorteo a sorteo con agregar_sorteo y en cada paso la estrategia
+# genera sus tickets solo con lo visto hasta ahí; luego se comparan contra el
+# sorteo siguiente. Cada paso cuesta lo mismo sin importar el largo del
+# historial, así que el recorrido completo es O(n).
+SORTEOS_INICIALES = 50
+
+_datos_trabajador = {}
+
+def _inicializar(balotas, numeros):
+    _datos_trabajador["balotas"] = balotas
+    _datos_trabajador["numeros"] = numeros
+
+def _tickets_del_paso(estrategia, entradas, cantidad, rng_py, rng_np, suma_objetivo, tolerancia):
+    if estrategia == "15_new":
+        jugadas, probabilidades = _candidatas_15_new(
+            entradas["ranking"], entradas["cooc_top5"], suma_objetivo, tolerancia
+        )
+        return jugadas[rng_np.choice(len(jugadas), size=cantidad, p=probabilidades)]
+    if estrategia == "15_old":
+        return [_ticket_15_old(entradas["ranking"], entradas["cooc_top5"], rng_py) for _ in range(cantidad)]
+    if estrategia == "optimas_v2":
+        return [_jugada_optima_v2(entradas["ranking"], rng_py) for _ in range(cantidad)]
+    return [
+        _jugada_por_patrones(entradas["ranking"], entradas["top_pares"], entradas["top_tripletas"], j, rng_py)
+        for j in range(cantidad)
+    ]
+
+def _recorrer(estrategia, semilla, desde, tickets_por_sorteo, suma_objetivo, tolerancia):
+    balotas, numeros = _datos_trabajador["balotas"], _datos_trabajador["numeros"]
+    semillas = np.random.SeedSequence((semilla, ESTRATEGIAS.index(estrategia)))
+    rng_np = np.random.default_rng(semillas)
+    rng_py = random.Random(int(semillas.generate_state(1, np.uint64)[0]))
+
+    ag = construir_agregados(balotas[:desde], numeros[:desde])
+    objetivos = mascaras(balotas)
+    distribucion = np.zeros(6, dtype=np.int64)
+    sin_ticket = 0
+    for t in range(desde, len(balotas)):
+        try:
+            tickets = _tickets_del_paso(
+                estrategia, entradas_de_agregados(ag), tickets_por_sorteo,
+                rng_py, rng_np, suma_objetivo, tolerancia,
+            )
+        except ValueError:
+            # la estrategia no tiene candidatas con lo visto hasta este sorteo
+            sin_ticket += 1
+        else:
+            aciertos = popcount(mascaras(np.asarray(tickets, dtype=np.uint8)) & objetivos[t])
+            distribucion += np.bincount(aciertos, minlength=6)[:6]
+        fila = balotas[t]
+        agregar_sorteo(ag, fila[fila > 0], numeros[t])
+
+    return {
+        "estrategia": estrategia,
+        "semilla": semilla,
+        "pasos": len(balotas) - desde,
+        "sin_ticket": sin_ticket,
+        "distribucion": distribucion.tolist(),
+    }
+
+def backtest(file_path, estrategias=ESTRATEGIAS, semillas=None, desde=SORTEOS_INICIALES,
+             tickets_por_sorteo=1, procesos=None, suma_objetivo=100, tolerancia=10):
+    """
+    Simula cada estrategia sobre el historial: a partir del sorteo `desde`
+    genera `tickets_por_sorteo` tickets por sorteo y cuenta cuántas balotas
+    acierta cada uno en el sorteo siguiente. Devuelve una fila por
+    (estrategia, semilla) con la distribución de 0 a 5 aciertos.
+    """
+    for estrategia in estrategias:
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida: {estrategia}. Opciones: {', '.join(ESTRATEGIAS)}")
+    if semillas is None:
+        semillas = [seed_por_archivo(file_path)]
+
+    columnas = cargar_columnas(file_path)
+    orden = np.asarray(columnas["orden"])
+    balotas = np.ascontiguousarray(columnas["balotas"][orden])
+    numeros = np.ascontiguousarray(columnas["numero"][orden])
+    desde = max(0, min(desde, len(balotas)))
+
+    tareas = [(e, s) for e in estrategias for s in semillas]
+    argumentos = (
+        [e for e, _ in tareas],
+        [s for _, s in tareas],
+        [desde] * len(tareas),
+        [tickets_por_sorteo] * len(tareas),
+        [suma_objetivo] * len(tareas),
+        [tolerancia] * len(tareas),
+    )
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(min(procesos, len(tareas)), initializer=_inicializar,
+                                 initargs=(balotas, numeros)) as pool:
+            return list(pool.map(_recorrer, *argumentos))
+    _inicializar(balotas, numeros)
+    return list(map(_recorrer, *argumentos))
+
+def imprimir_resultados(resultados):
+    print(f"{'Estrategia':<12}{'Semilla':>12}{'Tickets':>9}{'Prom.':>7}"
+          + "".join(f"{f'{k} ac.':>8}" for k in range(6)))
+    for r in resultados:
+        distribucion = np.array(r["distribucion"])
+        total = int(distribucion.sum())
+        promedio = (distribucion * np.arange(6)).sum() / total if total else 0.0
+        porcentajes = distribucion / total * 100 if total else distribucion.astype(float)
+        print(f"{r['estrategia']:<12}{r['semilla']:>12}{total:>9}{promedio:>7.3f}"
+              + "".join(f"{p:>7.2f}%" for p in porcentajes))
+        if r["sin_ticket"]:
+            print(f"  ({r['sin_ticket']} de {r['pasos']} sorteos sin ticket posible)")
@@ -0,0 +1,313 @@
+import io
+import os
+import sys
+import glob
+import json
+import time
+import random
+import shutil
+import subprocess
+import argparse
+import platform
+import tempfile
+import contextlib
+import numpy as np
+from datetime import datetime
+
+import analisis
+from lotes import ESTRATEGIAS, generar_lote
+from almacen import cargar_columnas, cargar_agregados, ruta_columnas, ruta_agregados
+from extractor import parsear_sorteo, parsear_total, update_json_file, compactar_journal
+from utils import cargar_json, vaciar_cache
+from benchmarks.generador import historial_en_cache, generar_historial
+from benchmarks.referencia import parsear_sorteo_bs4, parsear_total_bs4
+import parser_html
+from graficas import SECCIONES, disposicion, estadisticas_de_seccion
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Suite de benchmarks sobre historiales sintéticos.
+#
+#   python -m benchmarks.correr                                  # 1k y 10k sorteos
+#   python -m benchmarks.correr --tamaños 1000 10000 100000 1000000
+#   python -m benchmarks.correr --guardar benchmarks/base.json   # guardar línea base
+#   python -m benchmarks.correr --comparar benchmarks/base.json  # marcar regresiones
+#
+# Siempre se revisa además el arranque: el tiempo de importar main en un
+# intérprete nuevo (según -X importtime) debe quedar dentro del presupuesto
+# y sin cargar los módulos pesados, que se importan dentro de cada comando.
+#
+# Cada caso se mide en frío respecto de la caché en memoria (vaciar_cache()
+# antes de cada repetición), que es lo que paga una opción del menú al
+# arrancar el programa; los sidecars en disco sí se reutilizan salvo en los
+# casos de "carga", que los borran para medir su construcción.
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(DIRECTORIO)
+FIXTURES = os.path.join(DIRECTORIO, "fixtures")
+TAMAÑOS_POR_DEFECTO = (1_000, 10_000)
+REPETICIONES = 5
+UMBRAL = 1.25
+RUIDO_MINIMO = 0.001             # diferencias menores a 1 ms no se marcan
+SORTEOS_NUEVOS = 100             # sorteos por caso de update_json_file
+TICKETS_POR_LOTE = 1_000
+
+TICKET = [3, 11, 19, 27, 35]
+
+PRESUPUESTO_IMPORTACION = {"main": 0.1}           # segundos, importación acumulada
+MODULOS_PESADOS = ("numpy", "matplotlib", "requests", "bs4")
+
+ANALISIS = [
+    ("numeros_mas_frecuentes", ()),
+    ("numeros_menos_frecuentes", ()),
+    ("promedio_por_sorteo", ()),
+    ("diferencia_mayor_menor", ()),
+    ("conteo_pares_impares", ()),
+    ("conteo_por_rangos", ()),
+    ("pares_mas_comunes", ()),
+    ("tripletas_mas_comunes", ()),
+    ("numeros_repetidos_entre_sorteos", ()),
+    ("coincidencias_con_historial", (TICKET,)),
+    ("conteo_combinaciones_completas", ()),
+    ("combinaciones_completas_mas_comunes", ()),
+    ("ticket_ya_salio", (TICKET,)),
+    ("co_ocurrencia_de_numeros", ()),
+    ("numeros_que_no_han_salido", ()),
+    ("ranking_de_ausencias", ()),
+    ("tabla_de_horizontes", ()),
+    ("co_ocurrencias_del_numero_mas_frecuente", ()),
+    ("ranking_de_numeros", ()),
+    ("ranking_de_numeros_correlacion_prioritaria", ()),
+]
+
+TICKETS = [
+    ("generar_jugadas_optimas", ()),
+    ("generar_jugadas_optimas_v2", ()),
+    ("generar_jugadas_por_patrones", ()),
+    ("generar_jugadas_por_patrones_determinista", ()),
+    ("generar_ticket_estrategia_15_old", ()),
+    ("generar_ticket_estrategia_15_new", ()),
+]
+
+def _borrar_sidecars(file_path):
+    shutil.rmtree(ruta_columnas(file_path), ignore_errors=True)
+    if os.path.exists(ruta_agregados(file_path)):
+        os.remove(ruta_agregados(file_path))
+
+def casos_por_historial(file_path):
+    """(nombre, preparar, medir) para todo lo que depende del historial."""
+    def en_frio():
+        vaciar_cache()
+        random.seed(0)
+
+    casos = []
+    for nombre, args in ANALISIS:
+        funcion = getattr(analisis, nombre)
+        casos.append((f"analisis/{nombre}", en_frio, lambda f=funcion, a=args: f(file_path, *a)))
+    for nombre, args in TICKETS:
+        funcion = getattr(analisis, nombre)
+        casos.append((f"tickets/{nombre}", en_frio, lambda f=funcion, a=args: f(file_path, *a)))
+    for estrategia in ESTRATEGIAS:
+        casos.append((
+            f"tickets/generar_lote[{estrategia}]", en_frio,
+            lambda e=estrategia: generar_lote(file_path, e, TICKETS_POR_LOTE, procesos=1),
+        ))
+
+    def dibujar_seccion(clave):
+        # lo que paga una pestaña del dashboard o una sección del reporte
+        resumen = estadisticas_de_seccion(cargar_columnas(file_path), clave)
+        for generar, _, _, _ in disposicion(clave):
+            FigureCanvasAgg(generar(resumen)).draw()
+
+    for clave in SECCIONES:
+        casos.append((f"graficas/{clave}", en_frio, lambda c=clave: dibujar_seccion(c)))
+
+    def sin_sidecars():
+        vaciar_cache()
+        _borrar_sidecars(file_path)
+
+    casos += [
+        ("carga/cargar_json", en_frio, lambda: cargar_json(file_path)),
+        ("carga/construir_columnas", sin_sidecars, lambda: cargar_columnas(file_path)),
+        ("carga/construir_agregados", sin_sidecars, lambda: cargar_agregados(file_path)),
+    ]
+
+    # escritura: cada repetición trabaja sobre una copia fresca del historial
+    copia = f"{file_path}.escritura.json"
+    ultimo = len(cargar_json(file_path)["sorteos"])
+    nuevos = generar_historial(ultimo + SORTEOS_NUEVOS, semilla=1)["sorteos"][ultimo:]
+
+    def copia_fresca():
+        vaciar_cache()
+        shutil.copyfile(file_path, copia)
+        for ruta in glob.glob(f"{copia}.journal"):
+            os.remove(ruta)
+
+    def copia_con_journal():
+        copia_fresca()
+        for sorteo in nuevos:
+            update_json_file(sorteo, copia)
+
+    def escribir_journal():
+        for sorteo in nuevos:
+            update_json_file(sorteo, copia)
+
+    casos += [
+        (f"escritura/update_json_file[{SORTEOS_NUEVOS}]", copia_fresca, escribir_journal),
+        (f"escritura/compactar_journal[{SORTEOS_NUEVOS}]", copia_con_journal, lambda: compactar_journal(copia)),
+    ]
+    return casos
+
+def casos_del_parser():
+    casos = []
+    for ruta in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(ruta, 'rb') as file:
+            html = file.read()
+        nombre = os.path.basename(ruta)
+        # el parser dedicado debe dar exactamente lo mismo que el anterior
+        if parsear_sorteo(html) != parsear_sorteo_bs4(html) or parsear_total(html) != parsear_total_bs4(html):
+            raise AssertionError(f"parser_html no coincide con la referencia en {nombre}")
+        casos.append((f"parser/parsear_sorteo[{nombre}]", None, lambda h=html: parsear_sorteo(h)))
+        casos.append((f"parser/parsear_sorteo_bs4[{nombre}]", None, lambda h=html: parsear_sorteo_bs4(h)))
+        casos.append((f"parser/parsear_total[{nombre}]", None, lambda h=html: parsear_total(h)))
+        casos.append((f"parser/parsear_total_bs4[{nombre}]", None, lambda h=html: parsear_total_bs4(h)))
+    return casos
+
+def tiempo_de_importacion(modulo):
+    """Segundos acumulados de importar `modulo` en un intérprete nuevo, y los módulos pesados que arrastra."""
+    codigo = f"import sys, {modulo}; print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                             cwd=RAIZ, capture_output=True, text=True, check=True)
+    # líneas "import time: propio | acumulado | módulo", en microsegundos
+    for linea in proceso.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            pesados = [m for m in proceso.stdout.strip().split(",") if m]
+            return int(partes[1]) / 1e6, pesados
+    raise RuntimeError(f"No se encontró la importación de {modulo}")
+
+def medir_arranque(repeticiones):
+    resultados = {}
+    for modulo in PRESUPUESTO_IMPORTACION:
+        mediciones = [tiempo_de_importacion(modulo) for _ in range(repeticiones)]
+        tiempos = [t for t, _ in mediciones]
+        resultados[f"import {modulo}"] = {
+            "min": min(tiempos),
+            "mediana": float(np.median(tiempos)),
+            "pesados": mediciones[0][1],
+        }
+    return resultados
+
+def revisar_arranque(arranque):
+    """Imprime el arranque frente al presupuesto; devuelve los módulos que lo exceden."""
+    excedidos = []
+    for modulo, presupuesto in PRESUPUESTO_IMPORTACION.items():
+        medicion = arranque[f"import {modulo}"]
+        fuera = medicion["min"] > presupuesto or medicion["pesados"]
+        if fuera:
+            excedidos.append(modulo)
+        pesados = f", importa {', '.join(medicion['pesados'])}" if medicion["pesados"] else ""
+        print(f"import {modulo}: {medicion['min'] * 1000:.1f} ms (presupuesto {presupuesto * 1000:.0f} ms{pesados})"
+              f"{'  <- FUERA DE PRESUPUESTO' if fuera else ''}")
+    return excedidos
+
+def medir(preparar, funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return {"min": min(tiempos), "mediana": float(np.median(tiempos))}
+
+def correr(tamaños, repeticiones=REPETICIONES, filtro=None, datos=None):
+    datos = datos or os.path.join(DIRECTORIO, "datos")
+    resultados = {}
+
+    def ejecutar(grupo, casos):
+        for nombre, preparar, funcion in casos:
+            if filtro and filtro not in nombre:
+                continue
+            tiempo = medir(preparar, funcion, repeticiones)
+            resultados.setdefault(grupo, {})[nombre] = tiempo
+            print(f"{grupo:>8} {nombre:<55}{tiempo['min'] * 1000:>12.3f} ms")
+
+    if not filtro or any(filtro in f"arranque/import {m}" for m in PRESUPUESTO_IMPORTACION):
+        resultados["arranque"] = medir_arranque(repeticiones)
+    ejecutar("html", casos_del_parser())
+    for tamaño in tamaños:
+        origen = historial_en_cache(tamaño, datos)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "resultados.json")
+            shutil.copyfile(origen, file_path)
+            # los sidecars se construyen una vez antes de medir; los casos de
+            # carga los borran por su cuenta
+            cargar_agregados(file_path)
+            ejecutar(str(tamaño), casos_por_historial(file_path))
+        vaciar_cache()
+
+    return {
+        "meta": {
+            "fecha": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "parser": "lxml" if parser_html.lxml is not None else "html.parser",
+            "repeticiones": repeticiones,
+        },
+        "resultados": resultados,
+    }
+
+def comparar(actual, base, umbral=UMBRAL):
+    """Imprime la comparación contra una línea base; devuelve los casos más lentos que el umbral."""
+    regresiones = []
+    print(f"\n{'grupo':>8} {'caso':<55}{'base ms':>12}{'actual ms':>12}{'razón':>8}")
+    for grupo, casos in actual["resultados"].items():
+        for nombre, tiempo in casos.items():
+            anterior = base["resultados"].get(grupo, {}).get(nombre)
+            if anterior is None:
+                continue
+            razon = tiempo["min"] / anterior["min"] if anterior["min"] else float("inf")
+            lento = razon > umbral and tiempo["min"] - anterior["min"] > RUIDO_MINIMO
+            if lento:
+                regresiones.append((grupo, nombre, razon))
+            print(f"{grupo:>8} {nombre:<55}{anterior['min'] * 1000:>12.3f}{tiempo['min'] * 1000:>12.3f}"
+                  f"{razon:>7.2f}x{'  <- MÁS LENTO' if lento else ''}")
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de arranque, análisis, tickets, escritura, parser y gráficas.")
+    parser.add_argument("--tamaños", type=int, nargs="*", default=list(TAMAÑOS_POR_DEFECTO),
+                        help="cantidades de sorteos del historial sintético")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--solo", help="mide solo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--datos", help="directorio donde se guardan los historiales generados")
+    parser.add_argument("--guardar", help="escribe los resultados como línea base JSON")
+    parser.add_argument("--comparar", help="línea base JSON contra la cual comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL,
+                        help="razón actual/base a partir de la cual un caso se marca como más lento")
+    args = parser.parse_args(argv)
+
+    actual = correr(args.tamaños, args.repeticiones, args.solo, args.datos)
+    codigo = 0
+    if "arranque" in actual["resultados"]:
+        print()
+        if revisar_arranque(actual["resultados"]["arranque"]):
+            codigo = 1
+    if args.guardar:
+        with open(args.guardar, 'w') as file:
+            json.dump(actual, file, indent=2)
+        print(f"Línea base guardada en {args.guardar}")
+    if args.comparar:
+        with open(args.comparar, 'r') as file:
+            base = json.load(file)
+        regresiones = comparar(actual, base, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} casos más lentos que {args.umbral:.2f}x la línea base.")
+            return 1
+        print("\nSin regresiones.")
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
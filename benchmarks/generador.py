@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import numpy as np
+from datetime import date, timedelta
+
+# Historial sintético con el mismo esquema que produce el extractor:
+# numero, fecha ("05 de agosto de 2024"), dia, balotas, acumulado y
+# total_ganadores. Es determinista para una misma semilla, así que los
+# tiempos entre corridas se miden siempre sobre los mismos datos.
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+DIAS_DE_SORTEO = (0, 1, 3, 4)    # lunes, martes, jueves y viernes
+PRIMER_SORTEO = date(2021, 3, 1)
+BLOQUE = 100_000
+
+def generar_historial(cantidad, semilla=0):
+    rng = np.random.default_rng(semilla)
+    sorteos = []
+    fecha = PRIMER_SORTEO
+    for inicio in range(0, cantidad, BLOQUE):
+        b = min(BLOQUE, cantidad - inicio)
+        # 5 de 39 sin reposición: las 5 menores claves aleatorias de cada fila
+        balotas = (np.argpartition(rng.random((b, 39)), 5, axis=1)[:, :5] + 1).tolist()
+        acumulados = (rng.integers(1, 300_000, size=b) * 1_000_000).tolist()
+        ganadores = rng.integers(0, 20_000, size=b).tolist()
+        for i in range(b):
+            while fecha.weekday() not in DIAS_DE_SORTEO:
+                fecha += timedelta(days=1)
+            sorteos.append({
+                "numero": inicio + i + 1,
+                "fecha": f"{fecha.day:02d} de {MESES[fecha.month - 1]} de {fecha.year}",
+                "dia": DIAS[fecha.weekday()],
+                "balotas": balotas[i],
+                "acumulado": acumulados[i],
+                "total_ganadores": ganadores[i],
+            })
+            fecha += timedelta(days=1)
+
+    return {
+        "cantidadSorteos": cantidad,
+        "fechaUltimoSorteo": sorteos[-1]["fecha"] if sorteos else None,
+        "fechaUltimaConsulta": None,
+        "sorteos": sorteos,
+    }
+
+def escribir_historial(cantidad, file_path, semilla=0):
+    with open(file_path, 'w') as file:
+        json.dump(generar_historial(cantidad, semilla), file)
+
+def historial_en_cache(cantidad, directorio, semilla=0):
+    """Ruta a un historial sintético de `cantidad` sorteos, generándolo solo si no existe."""
+    os.makedirs(directorio, exist_ok=True)
+    file_path = os.path.join(directorio, f"historial_{cantidad}_{semilla}.json")
+    if not os.path.exists(file_path):
+        escribir_historial(cantidad, f"{file_path}.tmp", semilla)
+        os.replace(f"{file_path}.tmp", file_path)
+    return file_path
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Uso: python -m benchmarks.generador <cantidad> <salida.json> [semilla]")
+        sys.exit(1)
+    escribir_historial(int(sys.argv[1]), sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 0)
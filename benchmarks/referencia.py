@@ -0,0 +1,24 @@
+import re
+from bs4 import BeautifulSoup
+
+# El parser anterior de extractor.py (árbol completo de BeautifulSoup con
+# html.parser), guardado como referencia: los benchmarks comparan su salida
+# y su tiempo contra parser_html.
+def parsear_total_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    sorteo_element = soup.find('strong', string=re.compile(r'^SORTEO #\d+$'))
+    return int(re.search(r'\d+', sorteo_element.text).group()) if sorteo_element else None
+
+def parsear_sorteo_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    all_strongs = soup.find_all('strong')
+    num = int(re.search(r'\d+', soup.find('strong', string=re.compile(r'^SORTEO #\d+$')).text).group())
+    fecha = soup.find('div', class_='fs-5').text.strip()
+    dia = soup.find('div', class_='fs-2').text.strip()
+    balotas = [int(b.text.strip()) for b in soup.find_all('div', class_='yellow-ball')]
+    acumulado = int(soup.find('div', class_='results-accumulated-number shadow-inner').text.strip().replace('$', '').replace('.', '')) * 1_000_000
+    ganadores = int(soup.find('div', class_='fs-2 pink-light').text.strip().replace('.', ''))
+    return {
+        "numero": num, "fecha": fecha, "dia": dia,
+        "balotas": balotas, "acumulado": acumulado, "total_ganadores": ganadores
+    }
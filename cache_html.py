@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+import tempfile
+import requests
+from utils import guardar_json
+from metricas import medir
+
+# Caché en disco de las respuestas HTML, direccionada por contenido:
+#   <cache>/objetos/ab/abcdef...   cuerpo de la respuesta, nombrado por su sha256
+#   <cache>/urls/<sha256(url)>.json  {"url", "sha256", "etag", "last_modified"}
+# Las páginas de sorteos ya publicados no cambian: se sirven del disco sin
+# hacer ninguna petición. Las que pueden cambiar (el índice de resultados)
+# se revalidan con If-None-Match / If-Modified-Since y un 304 reutiliza el
+# cuerpo guardado.
+
+def _sha256(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+def _ruta_objeto(cache, sha256):
+    return os.path.join(cache, "objetos", sha256[:2], sha256)
+
+def _ruta_entrada(cache, url):
+    return os.path.join(cache, "urls", f"{_sha256(url.encode())}.json")
+
+def leer_entrada(cache, url):
+    try:
+        with open(_ruta_entrada(cache, url), 'r') as file:
+            entrada = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # una entrada sin su objeto (borrado a mano, disco lleno...) no sirve
+    return entrada if os.path.exists(_ruta_objeto(cache, entrada["sha256"])) else None
+
+@medir("http.cache", bytes=lambda contenido, *_: len(contenido))
+def leer_objeto(cache, sha256):
+    with open(_ruta_objeto(cache, sha256), 'rb') as file:
+        return file.read()
+
+def guardar_respuesta(cache, url, respuesta):
+    contenido = respuesta.content
+    sha256 = _sha256(contenido)
+    ruta = _ruta_objeto(cache, sha256)
+    if not os.path.exists(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # temporal único por escritura: varios hilos pueden guardar a la vez
+        # el mismo cuerpo (y por tanto el mismo objeto)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+        with os.fdopen(fd, 'wb') as file:
+            file.write(contenido)
+        os.replace(tmp, ruta)
+
+    os.makedirs(os.path.join(cache, "urls"), exist_ok=True)
+    guardar_json({
+        "url": url,
+        "sha256": sha256,
+        "etag": respuesta.headers.get("ETag"),
+        "last_modified": respuesta.headers.get("Last-Modified"),
+    }, _ruta_entrada(cache, url))
+    return contenido
+
+def descartar(cache, url):
+    """Olvida la entrada de `url` (p. ej. una página que no se pudo parsear); el objeto queda."""
+    try:
+        os.remove(_ruta_entrada(cache, url))
+    except FileNotFoundError:
+        pass
+
+def obtener(url, session=None, cache=None, revalidar=False):
+    """
+    Contenido de `url`, pasando por la caché si se indica un directorio.
+    Sin `revalidar`, una URL ya guardada se sirve del disco sin petición.
+    Solo se guardan respuestas 200; quien las parsea debe descartar() las
+    que resulten ser una página de error.
+    """
+    session = session or requests
+    if not cache:
+        return session.get(url).content
+
+    entrada = leer_entrada(cache, url)
+    if entrada and not revalidar:
+        return leer_objeto(cache, entrada["sha256"])
+
+    encabezados = {}
+    if entrada and entrada.get("etag"):
+        encabezados["If-None-Match"] = entrada["etag"]
+    if entrada and entrada.get("last_modified"):
+        encabezados["If-Modified-Since"] = entrada["last_modified"]
+
+    respuesta = session.get(url, headers=encabezados)
+    if respuesta.status_code == 304 and entrada:
+        return leer_objeto(cache, entrada["sha256"])
+    if respuesta.status_code == 200:
+        return guardar_respuesta(cache, url, respuesta)
+    return respuesta.content
+
+def paginas_guardadas(cache):
+    """(url, contenido) de todo lo que hay en la caché, para re-parsear sin red."""
+    directorio = os.path.join(cache, "urls")
+    if not os.path.isdir(directorio):
+        return
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directorio, nombre), 'r') as file:
+                entrada = json.load(file)
+            yield entrada["url"], leer_objeto(cache, entrada["sha256"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            continue
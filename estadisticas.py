@@ -0,0 +1,380 @@
+import numpy as np
+from math import comb
+from functools import lru_cache
+from itertools import combinations
+
+# Núcleos vectorizados sobre la matriz de balotas (n, 5) uint8 del almacén
+# columnar. El 0 marca una balota ausente y nunca se cuenta.
+MAX_BALOTA = 39
+SIN_APARICION = np.iinfo(np.int64).max
+
+# Pares ordenados de posiciones (i, j), i != j, recorridos por j y luego i.
+# Un dict por número registra a sus compañeros en orden (sorteo, j), que es
+# justamente el orden de las columnas de esta tabla.
+_POS_J, _POS_I = np.array([(j, i) for j in range(5) for i in range(5) if i != j]).T
+
+def matriz_de_sorteos(sorteos):
+    balotas = np.zeros((len(sorteos), 5), dtype=np.uint8)
+    for i, s in enumerate(sorteos):
+        b = s.get("balotas", [])[:5]
+        balotas[i, :len(b)] = b
+    return balotas
+
+def primeras_apariciones(filas, conteos, indices=None, bloque=256):
+    """
+    Primera posición (fila * ancho + columna) en la que aparece cada índice
+    de `conteos` dentro de `filas`, o SIN_APARICION. `indices` convierte un
+    bloque de filas en la matriz de índices a buscar (por defecto, el bloque
+    mismo). Los valores frecuentes aparecen pronto, así que se busca sobre
+    prefijos crecientes en vez de recorrer todo el historial.
+    """
+    primera = np.full(len(conteos), SIN_APARICION, dtype=np.int64)
+    faltan = int(np.count_nonzero(conteos))
+    inicio = 0
+    while faltan and inicio < len(filas):
+        fin = min(len(filas), inicio + bloque)
+        valores = np.asarray(filas[inicio:fin], dtype=np.int64)
+        if indices is not None:
+            valores = indices(valores)
+        unicos, idx = np.unique(valores.ravel(), return_index=True)
+        # los índices negativos o sin conteo (balota 0) marcan huecos
+        validos = unicos >= 0
+        unicos, idx = unicos[validos], idx[validos]
+        nuevos = (primera[unicos] == SIN_APARICION) & (conteos[unicos] > 0)
+        primera[unicos[nuevos]] = idx[nuevos] + inicio * valores.shape[1]
+        faltan -= int(np.count_nonzero(nuevos))
+        inicio, bloque = fin, bloque * 2
+    return primera
+
+def orden_counter(conteos, primera, ascendente=False, top=None):
+    """
+    Índices con conteo > 0 ordenados como lo haría Counter: por conteo y,
+    en empate, por orden de primera aparición. Con `top` solo se ordenan los
+    que pueden quedar entre los primeros `top`.
+    """
+    presentes = np.flatnonzero(conteos)
+    clave = conteos[presentes] if ascendente else -conteos[presentes]
+    if top is not None and top < len(presentes):
+        # todos los empatados con el último que entra siguen en carrera
+        corte = np.partition(clave, top - 1)[top - 1] if top > 0 else clave.min() - 1
+        presentes, clave = presentes[clave <= corte], clave[clave <= corte]
+    return presentes[np.lexsort((primera[presentes], clave))][:top]
+
+def mascaras(balotas):
+    """Cada sorteo como entero de 64 bits con el bit n encendido si salió la balota n."""
+    bits = np.left_shift(np.uint64(1), np.asarray(balotas, dtype=np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1) & ~np.uint64(1)
+
+def mascara_de(numeros):
+    return np.uint64(sum(1 << int(n) for n in set(numeros)))
+
+if hasattr(np, "bitwise_count"):
+    def popcount(valores):
+        return np.bitwise_count(valores)
+else:
+    _BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(valores):
+        valores = np.ascontiguousarray(valores, dtype=np.uint64)
+        return _BITS_POR_BYTE[valores.view(np.uint8)].reshape(valores.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def one_hot(balotas):
+    n = len(balotas)
+    X = np.zeros((n, MAX_BALOTA + 1), dtype=np.float32)
+    X[np.arange(n)[:, None], np.asarray(balotas)] = 1
+    X[:, 0] = 0
+    return X
+
+def matriz_coocurrencia(balotas, bloque=1 << 16):
+    # X.T @ X por bloques: float32 es exacto mientras cada bloque tenga < 2**24 filas
+    M = np.zeros((MAX_BALOTA + 1, MAX_BALOTA + 1), dtype=np.int64)
+    for inicio in range(0, len(balotas), bloque):
+        X = one_hot(balotas[inicio:inicio + bloque])
+        M += (X.T @ X).astype(np.int64)
+    return M
+
+def _indices_pares(bloque):
+    a, b = bloque[:, _POS_I], bloque[:, _POS_J]
+    return np.where((a > 0) & (b > 0), a * (MAX_BALOTA + 1) + b, 0)
+
+def motor_coocurrencia(balotas):
+    """
+    Matriz de co-ocurrencia (40 x 40, diagonal = frecuencia) y el orden de
+    primera aparición de cada número y de cada par, para desempatar igual
+    que los Counter/dict originales.
+    """
+    M = matriz_coocurrencia(balotas)
+    frec = np.diag(M).copy()
+    fuera_diagonal = M.copy()
+    np.fill_diagonal(fuera_diagonal, 0)
+    return {
+        "matriz": M,
+        "primera_numero": primeras_apariciones(balotas, frec),
+        "primera_par": primeras_apariciones(
+            balotas, fuera_diagonal.ravel(), _indices_pares
+        ).reshape(M.shape),
+    }
+
+def top_compañeros(motor, numero, k=5):
+    fila = motor["matriz"][numero].copy()
+    fila[numero] = 0
+    orden = orden_counter(fila, motor["primera_par"][numero])[:k]
+    return [(int(n), int(fila[n])) for n in orden]
+
+def top_compañeros_todos(motor, k=5):
+    """
+    top_compañeros para los 40 números de una vez: (compañeros, conteos),
+    ambos (40, k); las posiciones sin compañero quedan con conteo 0.
+    """
+    M = motor["matriz"].copy()
+    np.fill_diagonal(M, 0)
+    orden = np.lexsort((motor["primera_par"], -M))[:, :k]
+    return orden, np.take_along_axis(M, orden, axis=1)
+
+def numero_mas_frecuente(motor):
+    frec = np.diag(motor["matriz"])
+    orden = orden_counter(frec, motor["primera_numero"])
+    return int(orden[0]) if len(orden) else None
+
+def resumen_de_seccion(balotas, top=10, compañeros=5):
+    """
+    Lo que grafica una sección del dashboard, calculado una sola vez sobre
+    su matriz de balotas: frecuencias con sus top en orden Counter, paridad,
+    promedio y diferencia mayor-menor por sorteo, y la fila de co-ocurrencia
+    del número más frecuente.
+    """
+    balotas = np.asarray(balotas)
+    motor = motor_coocurrencia(balotas)
+    frec = np.diag(motor["matriz"]).copy()
+    con_balotas = np.count_nonzero(balotas, axis=1)
+    filas = con_balotas > 0
+    minimos = np.where(balotas > 0, balotas, 255).min(axis=1)
+    principal = numero_mas_frecuente(motor)
+    return {
+        "frecuencia": frec,
+        "mas_frecuentes": orden_counter(frec, motor["primera_numero"], top=top),
+        "menos_frecuentes": orden_counter(frec, motor["primera_numero"], ascendente=True, top=top),
+        "pares": int(frec[2::2].sum()),
+        "impares": int(frec[1::2].sum()),
+        "promedios": balotas.sum(axis=1, dtype=np.int64)[filas] / con_balotas[filas],
+        "diferencias": (balotas.max(axis=1).astype(np.int64) - minimos)[filas],
+        "principal": principal,
+        "compañeros": top_compañeros(motor, principal, compañeros) if principal is not None else [],
+    }
+
+# Posiciones de las combinaciones de 2 y 3 balotas de un sorteo ordenado, en
+# el mismo orden en que las produce itertools.combinations.
+_COMB_POS = {k: np.array(list(combinations(range(5), k))) for k in (2, 3)}
+
+# Rango lexicográfico de un k-subconjunto c1 < ... < ck de 1..39:
+# C(39, k) - 1 - sum_i C(39 - ci, k - i + 1). Con k = 2, 3 y 5 hay 741, 9139
+# y 575757 posiciones.
+_BINOMIALES = np.array([[comb(n, r) for r in range(6)] for n in range(MAX_BALOTA + 1)], dtype=np.int64)
+
+def total_combinaciones(k):
+    return comb(MAX_BALOTA, k)
+
+def rango_combinacion(combinacion):
+    k = len(combinacion)
+    return comb(MAX_BALOTA, k) - 1 - sum(
+        comb(MAX_BALOTA - c, k - i) for i, c in enumerate(sorted(combinacion))
+    )
+
+def combinacion_de_rango(rango, k):
+    """Inversa de rango_combinacion sin materializar la tabla completa."""
+    combinacion, siguiente = [], 1
+    for i in range(k, 0, -1):
+        while comb(MAX_BALOTA - siguiente, i - 1) <= rango:
+            rango -= comb(MAX_BALOTA - siguiente, i - 1)
+            siguiente += 1
+        combinacion.append(siguiente)
+        siguiente += 1
+    return combinacion
+
+def rangos_combinaciones(ordenadas):
+    """Rango de cada fila (ya ordenada) de `ordenadas`; -1 si tiene balotas ausentes."""
+    ordenadas = np.asarray(ordenadas, dtype=np.int64)
+    k = ordenadas.shape[1]
+    resta = _BINOMIALES[MAX_BALOTA - np.clip(ordenadas, 1, MAX_BALOTA), k - np.arange(k)].sum(axis=1)
+    return np.where((ordenadas > 0).all(axis=1), comb(MAX_BALOTA, k) - 1 - resta, -1)
+
+@lru_cache(maxsize=None)
+def combinaciones(k):
+    """Todas las combinaciones de k balotas en orden lexicográfico: fila i = rango i."""
+    # se extiende cada prefijo con todos los valores mayores a su último
+    # elemento; los prefijos que no pueden completarse desaparecen solos
+    tabla = np.arange(1, MAX_BALOTA + 1, dtype=np.uint8)[:, None]
+    for _ in range(k - 1):
+        ultimo = tabla[:, -1].astype(np.int64)
+        cuantos = MAX_BALOTA - ultimo
+        desplazamiento = np.arange(cuantos.sum()) - np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+        siguiente = np.repeat(ultimo, cuantos) + 1 + desplazamiento
+        tabla = np.column_stack([np.repeat(tabla, cuantos, axis=0), siguiente.astype(np.uint8)])
+    tabla.setflags(write=False)
+    return tabla
+
+def rango_bucket(n):
+    # rangos de la estrategia 15: 1-13, 14-26, 27-39
+    return (n - 1) // 13
+
+@lru_cache(maxsize=None)
+def caracteristicas_combinaciones():
+    """
+    Columnas precalculadas para las 575757 jugadas de combinaciones(5):
+    suma, impares, cantidad por rango (1-13, 14-26, 27-39), rangos
+    cubiertos, si tiene consecutivos, el salto máximo entre balotas y la
+    máscara de bits de la jugada.
+    """
+    tabla = combinaciones(5).astype(np.int16)
+    saltos = np.diff(tabla, axis=1)
+    por_rango = np.stack([(rango_bucket(tabla) == r).sum(axis=1) for r in range(3)], axis=1)
+    caracteristicas = {
+        "suma": tabla.sum(axis=1, dtype=np.int16),
+        "impares": (tabla % 2 == 1).sum(axis=1).astype(np.uint8),
+        "por_rango": por_rango.astype(np.uint8),
+        "rangos_cubiertos": (por_rango > 0).sum(axis=1).astype(np.uint8),
+        "consecutivos": (saltos == 1).any(axis=1),
+        "salto_maximo": saltos.max(axis=1).astype(np.uint8),
+        "mascara": mascaras(tabla),
+    }
+    for columna in caracteristicas.values():
+        columna.setflags(write=False)
+    return caracteristicas
+
+def filtrar_combinaciones(impares=None, min_rangos=None, sin_consecutivos=False,
+                          suma_objetivo=None, tolerancia=0, salto_maximo=None):
+    """Máscara booleana sobre combinaciones(5) con las jugadas que cumplen las reglas dadas."""
+    c = caracteristicas_combinaciones()
+    mascara = np.ones(len(c["suma"]), dtype=bool)
+    if impares is not None:
+        mascara &= c["impares"] == impares
+    if min_rangos is not None:
+        mascara &= c["rangos_cubiertos"] >= min_rangos
+    if sin_consecutivos:
+        mascara &= ~c["consecutivos"]
+    if suma_objetivo is not None:
+        mascara &= np.abs(c["suma"].astype(np.int32) - suma_objetivo) <= tolerancia
+    if salto_maximo is not None:
+        mascara &= c["salto_maximo"] <= salto_maximo
+    return mascara
+
+def _indices_combinaciones(k):
+    def indices(bloque):
+        sub = bloque[:, _COMB_POS[k]]                      # (m, C(5, k), k)
+        return rangos_combinaciones(sub.reshape(-1, k)).reshape(sub.shape[:2])
+    return indices
+
+def conteo_combinaciones(ordenadas, k):
+    """
+    Conteo de cada k-subconjunto presente en los sorteos (filas ordenadas)
+    con un solo bincount sobre sus rangos, más la posición de su primera
+    aparición en el orden (sorteo, combinations()).
+    """
+    indices = _indices_combinaciones(k)
+    rangos = indices(np.asarray(ordenadas, dtype=np.int64)).ravel()
+    conteos = np.bincount(rangos[rangos >= 0], minlength=total_combinaciones(k))
+    return conteos, primeras_apariciones(ordenadas, conteos, indices)
+
+def construir_agregados(balotas, numeros):
+    """
+    Agregados materializados del historial: todo lo que los análisis del
+    menú necesitan, en arreglos de tamaño fijo que agregar_sorteo mantiene
+    en O(1) por sorteo nuevo. Las posiciones de primera aparición replican
+    el orden de inserción de los Counter originales.
+    """
+    balotas = np.asarray(balotas)
+    n = len(balotas)
+    motor = motor_coocurrencia(balotas)
+    frec = np.diag(motor["matriz"]).copy()
+    ordenadas = np.sort(balotas, axis=1).astype(np.int64)
+
+    pares, primera_pareja = conteo_combinaciones(ordenadas, 2)
+    tripletas, primera_tripleta = conteo_combinaciones(ordenadas, 3)
+
+    cantidad = np.count_nonzero(balotas, axis=1)
+    sumas = balotas.sum(axis=1, dtype=np.int64)
+    minimos = np.where(balotas > 0, balotas, 255).min(axis=1)
+    diferencias = balotas.max(axis=1).astype(np.int64) - minimos
+    impares = np.count_nonzero(balotas % 2 == 1, axis=1)
+
+    X = one_hot(balotas).astype(bool)
+    # última aparición de cada número, en posiciones del orden por número de sorteo
+    ultima = np.full(MAX_BALOTA + 1, -1, dtype=np.int64)
+    ultima_inversa = primeras_apariciones(balotas[np.argsort(numeros, kind="stable")[::-1]], frec)
+    vistos = ultima_inversa != SIN_APARICION
+    ultima[vistos] = n - 1 - ultima_inversa[vistos] // 5
+
+    return {
+        "cantidad": np.int64(n),
+        "ultimo_numero": np.int64(numeros.max() if n else 0),
+        "frecuencia": frec,
+        "primera_numero": motor["primera_numero"],
+        "coocurrencia": motor["matriz"],
+        "primera_par": motor["primera_par"],
+        "pares": pares,
+        "primera_pareja": primera_pareja,
+        "tripletas": tripletas,
+        "primera_tripleta": primera_tripleta,
+        "paridad": np.bincount(impares, minlength=6),
+        "rangos": np.add.reduceat(frec, [1, 11, 21, 31]),
+        # suma secuencial, como sum() sobre la lista de promedios
+        "suma_promedios": np.float64(sum((sumas / cantidad).tolist())),
+        "suma_diferencias": np.int64(diferencias.sum()),
+        "diferencia_minima": np.int64(diferencias.min() if n else 0),
+        "diferencia_maxima": np.int64(diferencias.max() if n else 0),
+        "repeticiones": np.int64((X[1:] & X[:-1]).sum()),
+        "ultima_posicion": ultima,
+        "ultimo_sorteo": balotas[-1].astype(np.int64) if n else np.zeros(5, dtype=np.int64),
+    }
+
+def ausencias(agregados):
+    """
+    Sorteos transcurridos desde la última aparición de cada número (0 = salió
+    en el último sorteo); None para los que nunca han salido.
+    """
+    n = int(agregados["cantidad"])
+    return {
+        numero: (n - 1 - int(pos) if pos >= 0 else None)
+        for numero, pos in enumerate(agregados["ultima_posicion"][1:], start=1)
+    }
+
+def _marcar_primera(primera, idx, posicion):
+    if primera[idx] == SIN_APARICION:
+        primera[idx] = posicion
+
+def agregar_sorteo(agregados, balotas, numero):
+    """Suma un sorteo nuevo (al final del historial) a los agregados, en O(1)."""
+    ag = agregados
+    d = int(ag["cantidad"])
+    b = [int(x) for x in balotas][:5]
+
+    for i, x in enumerate(b):
+        ag["frecuencia"][x] += 1
+        ag["coocurrencia"][x, x] += 1
+        ag["ultima_posicion"][x] = d
+        _marcar_primera(ag["primera_numero"], x, d * 5 + i)
+    for p, (j, i) in enumerate(zip(_POS_J, _POS_I)):
+        if i < len(b) and j < len(b):
+            ag["coocurrencia"][b[i], b[j]] += 1
+            _marcar_primera(ag["primera_par"], (b[i], b[j]), d * 20 + p)
+
+    ordenadas = sorted(b)
+    for k, conteos, primera in ((2, "pares", "primera_pareja"), (3, "tripletas", "primera_tripleta")):
+        for c, combinacion in enumerate(combinations(ordenadas, k)):
+            idx = rango_combinacion(combinacion)
+            ag[conteos][idx] += 1
+            _marcar_primera(ag[primera], idx, d * 10 + c)
+
+    ag["paridad"][sum(1 for x in b if x % 2 == 1)] += 1
+    for x in b:
+        ag["rangos"][min((x - 1) // 10, 3)] += 1
+    diferencia = max(b) - min(b)
+    ag["suma_promedios"] = ag["suma_promedios"] + sum(b) / len(b)
+    ag["suma_diferencias"] = ag["suma_diferencias"] + diferencia
+    ag["diferencia_minima"] = diferencia if d == 0 else min(int(ag["diferencia_minima"]), diferencia)
+    ag["diferencia_maxima"] = diferencia if d == 0 else max(int(ag["diferencia_maxima"]), diferencia)
+    if d > 0:
+        ag["repeticiones"] = ag["repeticiones"] + len(set(b) & set(ag["ultimo_sorteo"].tolist()))
+    ag["ultimo_sorteo"] = np.array(b + [0] * (5 - len(b)), dtype=np.int64)
+    ag["ultimo_numero"] = max(int(ag["ultimo_numero"]), int(numero))
+    ag["cantidad"] = d + 1
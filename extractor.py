@@ -1,29 +1,94 @@
-import requests, re
-from bs4 import BeautifulSoup
+import requests, os, json
 from datetime import datetime
-from utils import cargar_json, guardar_json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from utils import cargar_json, leer_json, guardar_json, huella_archivo
+from almacen import actualizar_agregados
+from metricas import medir
+from planificador import Planificador
+import cache_html
+import parser_html
 
-def get_total_sorteos(url):
+CONCURRENCIA_POR_DEFECTO = 8
+COMPACTAR_CADA = 500
+# caché de páginas en disco (ver cache_html.py); vacío para desactivarla
+DIRECTORIO_CACHE = os.environ.get("MILOTO_CACHE_HTML", "cache_html")
+
+def crear_sesion(concurrencia=CONCURRENCIA_POR_DEFECTO):
+    # una sola sesión keep-alive compartida por todos los hilos; el pool
+    # de conexiones debe ser al menos tan grande como la concurrencia. El
+    # planificador (ver planificador.py) decide cuántas peticiones salen a
+    # la vez y a qué ritmo, y reintenta los 429/5xx
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrencia)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return Planificador(session, concurrencia)
+
+@medir("http.descarga", bytes=lambda contenido, *_: len(contenido))
+def descargar_pagina(url, session=None, cache=None, revalidar=False):
+    return cache_html.obtener(url, session, cache, revalidar)
+
+def _largo_html(_, html):
+    return len(html)
+
+@medir("html.parseo", bytes=_largo_html)
+def parsear_total(html):
+    return parser_html.parsear_total(html)
+
+def get_total_sorteos(url, session=None, cache=None):
+    # el índice cambia con cada sorteo: siempre se revalida
     try:
-        soup = BeautifulSoup(requests.get(url).content, 'html.parser')
-        sorteo_element = soup.find('strong', string=re.compile(r'^SORTEO #\d+$'))
-        return int(re.search(r'\d+', sorteo_element.text).group()) if sorteo_element else None
-    except:
+        return parsear_total(descargar_pagina(url, session, cache, revalidar=True))
+    except requests.RequestException as e:
+        print(f"Error al obtener el total de sorteos: {e}")
         return None
 
-def get_sorteo_data(url):
-    soup = BeautifulSoup(requests.get(url).content, 'html.parser')
-    all_strongs = soup.find_all('strong')
-    num = int(re.search(r'\d+', soup.find('strong', string=re.compile(r'^SORTEO #\d+$')).text).group())
-    fecha = soup.find('div', class_='fs-5').text.strip()
-    dia = soup.find('div', class_='fs-2').text.strip()
-    balotas = [int(b.text.strip()) for b in soup.find_all('div', class_='yellow-ball')]
-    acumulado = int(soup.find('div', class_='results-accumulated-number shadow-inner').text.strip().replace('$', '').replace('.', '')) * 1_000_000
-    ganadores = int(soup.find('div', class_='fs-2 pink-light').text.strip().replace('.', ''))
-    return {
-        "numero": num, "fecha": fecha, "dia": dia,
-        "balotas": balotas, "acumulado": acumulado, "total_ganadores": ganadores
-    }
+def get_sorteo_data(url, session=None, cache=None):
+    # un sorteo publicado no cambia: si está en caché no se pide
+    contenido = descargar_pagina(url, session, cache)
+    try:
+        return parsear_sorteo(contenido)
+    except (AttributeError, ValueError):
+        # una página de error o provisoria (200 sin el sorteo) no puede
+        # quedar en caché: se vuelve a pedir en el próximo intento
+        if cache:
+            cache_html.descartar(cache, url)
+        raise
+
+@medir("html.parseo", bytes=_largo_html)
+def parsear_sorteo(html):
+    return parser_html.parsear_sorteo(html)
+
+def descargar_sorteos(numeros, url_base, concurrencia=CONCURRENCIA_POR_DEFECTO, session=None, cache=None):
+    """
+    Descarga los sorteos indicados con un pool acotado de hilos que comparten
+    una sesión keep-alive. Produce (numero, sorteo) en el mismo orden de
+    `numeros`, con sorteo=None si la descarga o el parseo fallaron.
+    """
+    session = session or crear_sesion(concurrencia)
+
+    def descargar(i):
+        try:
+            return get_sorteo_data(f"{url_base}{i}/", session, cache)
+        except (requests.RequestException, AttributeError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        # map() conserva el orden de entrada aunque las descargas terminen desordenadas
+        yield from zip(numeros, pool.map(descargar, numeros))
+
+def sorteos_en_cache(url_base, cache=DIRECTORIO_CACHE):
+    """Re-parsea sin red las páginas de sorteos guardadas en la caché."""
+    sorteos = []
+    for url, contenido in cache_html.paginas_guardadas(cache):
+        if not url.startswith(url_base):
+            continue
+        try:
+            sorteos.append(parsear_sorteo(contenido))
+        except (AttributeError, ValueError):
+            continue
+    return sorted(sorteos, key=lambda s: s["numero"])
 
 def get_sorteos_existentes(file_path):
     try:
@@ -32,11 +97,63 @@ def get_sorteos_existentes(file_path):
     except:
         return set()
 
+def ruta_journal(file_path):
+    return f"{file_path}.journal"
+
+def leer_journal(file_path):
+    sorteos = []
+    try:
+        with open(ruta_journal(file_path), 'r') as file:
+            for linea in file:
+                try:
+                    sorteos.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    # última línea truncada por un corte: se descarta y se vuelve a bajar
+                    break
+    except FileNotFoundError:
+        pass
+    return sorteos
+
+@medir("json.journal")
 def update_json_file(sorteo, file_path):
-    data = cargar_json(file_path)
-    if not any(s["numero"] == sorteo["numero"] for s in data["sorteos"]):
-        data["sorteos"].append(sorteo)
-        data["fechaUltimoSorteo"] = sorteo["fecha"]
-        data["cantidadSorteos"] = max(s["numero"] for s in data["sorteos"])
+    # append-only: una línea compacta por sorteo; el almacén principal se
+    # reescribe solo al compactar
+    with open(ruta_journal(file_path), 'a') as file:
+        file.write(json.dumps(sorteo, separators=(',', ':')) + "\n")
+
+def compactar_journal(file_path):
+    """
+    Vuelca el journal en el almacén principal (escritura atómica) y lo elimina.
+    Devuelve cuántos sorteos nuevos se incorporaron.
+    """
+    nuevos = leer_journal(file_path)
+    if not nuevos:
+        if os.path.exists(ruta_journal(file_path)):
+            os.remove(ruta_journal(file_path))
+        return 0
+
+    huella_anterior = huella_archivo(file_path)
+    data = leer_json(file_path)
+    sorteos = data["sorteos"]
+    ordenado = all(a["numero"] < b["numero"] for a, b in zip(sorteos, sorteos[1:]))
+    existentes = {s["numero"] for s in sorteos}
+    agregados = []
+    for sorteo in nuevos:
+        if sorteo["numero"] not in existentes:
+            sorteos.append(sorteo)
+            existentes.add(sorteo["numero"])
+            agregados.append(sorteo)
+
+    if agregados:
+        sorteos.sort(key=lambda s: s["numero"])
+        data["fechaUltimoSorteo"] = sorteos[-1]["fecha"]
+        data["cantidadSorteos"] = sorteos[-1]["numero"]
     data["fechaUltimaConsulta"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     guardar_json(data, file_path)
+
+    # los agregados se actualizan en O(1) por sorteo solo si los nuevos
+    # quedaron al final; si el orden cambió se reconstruirán al leerlos
+    if agregados and ordenado and sorteos[-len(agregados):] == agregados:
+        actualizar_agregados(file_path, huella_anterior, agregados)
+    os.remove(ruta_journal(file_path))
+    return len(agregados)
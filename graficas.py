@@ -0,0 +1,138 @@
+import datetime
+import numpy as np
+from matplotlib.figure import Figure
+from estadisticas import MAX_BALOTA, resumen_de_seccion
+
+# Gráficas del dashboard, sin depender de Tk ni de pyplot: cada graf_*
+# recibe el resumen de una sección (resumen_de_seccion) y devuelve una
+# Figure que puede mostrarse en la ventana (dashboard.py) o guardarse en
+# disco (reporte.py).
+
+año_actual = datetime.datetime.now().year
+
+def _del_año(columnas, año):
+    # fechas NaT (no interpretables) quedan fuera
+    años = np.asarray(columnas["fecha"]).astype("datetime64[Y]").astype(np.int64) + 1970
+    return np.flatnonzero(años == año)
+
+# Secciones dinámicas: cada filtro devuelve los índices de sus sorteos en el
+# almacén columnar
+SECCIONES = {
+    "historial_total": {
+        "titulo": "📚 Historial completo",
+        "filtro": lambda columnas: np.arange(len(columnas["numero"]))
+    },
+    "año_actual": {
+        "titulo": f"📅 Año {año_actual}",
+        "filtro": lambda columnas: _del_año(columnas, año_actual)
+    },
+    "ultimos_50": {
+        "titulo": "🎯 Últimos 50 sorteos",
+        "filtro": lambda columnas: np.asarray(columnas["orden"][-50:])
+    }
+}
+
+def estadisticas_de_seccion(columnas, clave):
+    indices = SECCIONES[clave]["filtro"](columnas)
+    return resumen_de_seccion(np.asarray(columnas["balotas"])[indices])
+
+# Funciones de análisis visual: reciben el resumen de la sección
+def graf_frecuencia(e):
+    nums = [str(n) for n in e["mas_frecuentes"]]
+    vals = e["frecuencia"][e["mas_frecuentes"]]
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.bar(nums, vals)
+    ax.set_title("Más frecuentes")
+    return fig
+
+def graf_menos_frecuentes(e):
+    nums = [str(n) for n in e["menos_frecuentes"]]
+    vals = e["frecuencia"][e["menos_frecuentes"]]
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.bar(nums, vals, color='orange')
+    ax.set_title("Menos frecuentes")
+    return fig
+
+def graf_pares_impares(e):
+    if not e["pares"] + e["impares"]:
+        return Figure(figsize=(6, 4))
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.pie([e["pares"], e["impares"]], labels=["Pares", "Impares"], autopct='%1.1f%%', startangle=90)
+    ax.set_title("Pares vs Impares")
+    return fig
+
+def graf_promedio(e):
+    promedios = e["promedios"]
+    promedio = round(float(promedios.mean()), 2) if len(promedios) else 0
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.bar(["Promedio"], [promedio], color="green")
+    ax.set_title("Promedio por sorteo")
+    return fig
+
+def graf_diferencia(e):
+    diferencias = e["diferencias"]
+    if not len(diferencias):
+        return Figure(figsize=(6, 4))
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.bar(["Min", "Prom", "Max"], [diferencias.min(), diferencias.mean(), diferencias.max()], color="purple")
+    ax.set_title("Diferencia mayor-menor")
+    return fig
+
+def graf_coocurrencias(e):
+    if e["principal"] is None:
+        return Figure(figsize=(6, 4))
+
+    nums = [str(n) for n, _ in e["compañeros"]]
+    vals = [c for _, c in e["compañeros"]]
+
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.bar(nums, vals, color="red")
+    ax.set_title(f"Co-ocurrencias con #{e['principal']}")
+    return fig
+
+def graf_histograma_balotas(e):
+    if not e["frecuencia"].any():
+        return Figure(figsize=(6, 4))
+
+    # ya vienen contadas: una barra por número con su frecuencia como peso
+    numeros = np.arange(1, MAX_BALOTA + 1)
+    fig = Figure(figsize=(6, 4), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.hist(numeros, bins=range(1, MAX_BALOTA + 2), weights=e["frecuencia"][1:], edgecolor="black", align='left')
+    ax.set_title("Histograma de Balotas")
+    ax.set_xlabel("Número de Balota")
+    ax.set_ylabel("Frecuencia")
+    return fig
+
+# Lista de funciones gráficas (en una grilla de 3 columnas)
+GRAFICAS = [
+    graf_frecuencia,
+    graf_menos_frecuentes,
+    graf_pares_impares,
+    graf_promedio,
+    graf_diferencia,
+    graf_coocurrencias
+]
+
+# Gráficas adicionales por sección, a todo el ancho sobre las estándar
+GRAFICAS_EXTRA = {
+    "historial_total": [graf_histograma_balotas],
+}
+
+def disposicion(clave):
+    """(función, fila, columna, columnas que ocupa) de cada gráfica de la sección."""
+    extra = GRAFICAS_EXTRA.get(clave, [])
+    celdas = [(generar, fila, 0, 3) for fila, generar in enumerate(extra)]
+    for idx, generar in enumerate(GRAFICAS):
+        celdas.append((generar, len(extra) + idx // 3, idx % 3, 1))
+    return celdas
@@ -0,0 +1,98 @@
+import os
+import math
+import random
+import numpy as np
+from metricas import etapa
+from concurrent.futures import ProcessPoolExecutor
+from analisis import (
+    entradas_estrategias,
+    _ticket_15_old,
+    _candidatas_15_new,
+    _jugada_optima_v2,
+    _jugada_por_patrones,
+)
+
+# Generación de muchos tickets por estrategia. Los datos compartidos
+# (ranking, co-ocurrencias, patrones...) se calculan una vez y cada trozo de
+# TAMAÑO_TROZO tickets usa su propio flujo aleatorio, derivado con
+# SeedSequence.spawn de la semilla del archivo: el resultado es el mismo sin
+# importar cuántos procesos se usen.
+ESTRATEGIAS = ("15_old", "15_new", "optimas_v2", "patrones")
+TAMAÑO_TROZO = 64
+MAX_RONDAS = 20
+
+_datos_trabajador = {}
+
+def _inicializar(estrategia, datos):
+    _datos_trabajador["estrategia"] = estrategia
+    _datos_trabajador["datos"] = datos
+
+def _generar_trozo(semilla, inicio, cantidad):
+    estrategia, datos = _datos_trabajador["estrategia"], _datos_trabajador["datos"]
+
+    if estrategia == "15_new":
+        rng = np.random.default_rng(semilla)
+        elegidas = rng.choice(len(datos["jugadas"]), size=cantidad, p=datos["probabilidades"])
+        return [[int(n) for n in datos["jugadas"][i]] for i in elegidas]
+
+    rng = random.Random(int(semilla.generate_state(1, np.uint64)[0]))
+    if estrategia == "15_old":
+        return [_ticket_15_old(datos["ranking"], datos["cooc_top5"], rng) for _ in range(cantidad)]
+    if estrategia == "optimas_v2":
+        return [_jugada_optima_v2(datos["ranking"], rng) for _ in range(cantidad)]
+    return [
+        _jugada_por_patrones(datos["ranking"], datos["top_pares"], datos["top_tripletas"], inicio + j, rng)
+        for j in range(cantidad)
+    ]
+
+def generar_lote(file_path, estrategia, cantidad, procesos=None, suma_objetivo=100, tolerancia=10):
+    """
+    Genera hasta `cantidad` tickets distintos con la estrategia indicada.
+    Devuelve menos si la estrategia no logra producir tantos distintos.
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia}. Opciones: {', '.join(ESTRATEGIAS)}")
+
+    entradas = entradas_estrategias(file_path)
+    datos = entradas
+    if estrategia == "15_new":
+        jugadas, probabilidades = _candidatas_15_new(
+            entradas["ranking"], entradas["cooc_top5"], suma_objetivo, tolerancia
+        )
+        datos = {"jugadas": jugadas, "probabilidades": probabilidades}
+
+    procesos = procesos or os.cpu_count() or 1
+    raiz = np.random.SeedSequence(entradas["semilla"])
+    tickets, vistos, inicio = [], set(), 0
+    pool = None
+    try:
+        for _ in range(MAX_RONDAS):
+            faltan = cantidad - len(tickets)
+            if faltan <= 0:
+                break
+            with etapa(f"tickets.lote.{estrategia}"):
+                n_trozos = math.ceil(faltan / TAMAÑO_TROZO)
+                semillas = raiz.spawn(n_trozos)
+                inicios = [inicio + i * TAMAÑO_TROZO for i in range(n_trozos)]
+                tamaños = [TAMAÑO_TROZO] * n_trozos
+                inicio += n_trozos * TAMAÑO_TROZO
+
+                if procesos > 1 and n_trozos > 1:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(procesos, initializer=_inicializar, initargs=(estrategia, datos))
+                    trozos = pool.map(_generar_trozo, semillas, inicios, tamaños)
+                else:
+                    _inicializar(estrategia, datos)
+                    trozos = map(_generar_trozo, semillas, inicios, tamaños)
+
+                # deduplicación en orden de trozo: determinista
+                for trozo in trozos:
+                    for ticket in trozo:
+                        clave = tuple(ticket)
+                        if clave not in vistos and len(tickets) < cantidad:
+                            vistos.add(clave)
+                            tickets.append(ticket)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return tickets
@@ -1,67 +1,60 @@
-from utils import revisar_json, crear_json_vacio
-from extractor import get_total_sorteos, get_sorteo_data, get_sorteos_existentes, update_json_file
-from analisis import (
-    numeros_mas_frecuentes,
-    numeros_menos_frecuentes,
-    promedio_por_sorteo,
-    diferencia_mayor_menor,
-    conteo_pares_impares,
-    conteo_por_rangos,
-    pares_mas_comunes,
-    tripletas_mas_comunes,
-    numeros_repetidos_entre_sorteos,
-    combinaciones_completas_mas_comunes,
-    co_ocurrencia_de_numeros,
-    numeros_que_no_han_salido,
-    co_ocurrencias_del_numero_mas_frecuente,
-    generar_jugadas_optimas,
-    generar_jugadas_optimas_v2,
-    generar_jugadas_por_patrones_determinista,
-    generar_ticket_estrategia_15,
-    )
-
-def menu():
-    file_path = "resultados.json"
-    url_main = "https://baloto.com/miloto/resultados/"
-    url_base = "https://baloto.com/miloto/resultados-miloto/"
+import os
+import sys
+import json
+import time
+import argparse
+from utils import crear_json_vacio
+
+# Los módulos pesados (numpy, requests, matplotlib...) se importan dentro de
+# cada comando: arrancar para sincronizar no paga el costo del análisis y
+# viceversa. benchmarks/correr.py controla el presupuesto de importación.
+FILE_PATH = "resultados.json"
+
+def configuracion():
+    # las variables de entorno permiten apuntar a un servidor local de pruebas;
+    # sin MILOTO_CONCURRENCIA rige el valor por defecto de extractor
+    url_main = os.environ.get("MILOTO_URL_MAIN", "https://baloto.com/miloto/resultados/")
+    url_base = os.environ.get("MILOTO_URL_BASE", "https://baloto.com/miloto/resultados-miloto/")
+    concurrencia = os.environ.get("MILOTO_CONCURRENCIA")
+    opciones = {"concurrencia": int(concurrencia)} if concurrencia else {}
+    return url_main, url_base, opciones
+
+def menu(file_path=FILE_PATH):
+    url_main, url_base, opciones = configuracion()
 
     print("\nMenú:")
     print("1. Actualizar sorteos.")
     print("2. Analizar números frecuentes.")
     print("3. Mostrar dashboard.")
     print("4. Salir.")
+    print("5. Vigilar nuevos sorteos (modo continuo, Ctrl+C para detener).")
     opcion = input("Seleccione una opción: ")
 
     if opcion == "1":
-        print("Obteniendo el total de sorteos disponibles...")
-        total = get_total_sorteos(url_main)
-
-        if not total:
-            print("No se pudo obtener el número total de sorteos.")
-            return
-
-        print(f"Total de sorteos en línea: {total}")
-        existentes = get_sorteos_existentes(file_path)
-        print(f"Sorteos ya descargados localmente: {len(existentes)}")
-
-        faltantes = [i for i in range(1, total + 1) if i not in existentes]
-
-        if not faltantes:
-            print("Todos los sorteos están actualizados.")
-            return
-
-        print(f"Sorteos que faltan: {faltantes}")
-
-        for i in faltantes:
-            print(f"Descargando sorteo #{i}...")
-            sorteo = get_sorteo_data(f"{url_base}{i}/")
-            if sorteo:
-                update_json_file(sorteo, file_path)
-                print(f"Sorteo #{i} guardado.")
-            else:
-                print(f"No se pudo obtener el sorteo #{i}. Probablemente ya no exista o hubo un error.")
+        from sincronizacion import sincronizar
+        sincronizar(file_path, url_main, url_base, **opciones)
 
     elif opcion == "2":
+        from analisis import (
+            numeros_mas_frecuentes,
+            numeros_menos_frecuentes,
+            promedio_por_sorteo,
+            diferencia_mayor_menor,
+            conteo_pares_impares,
+            conteo_por_rangos,
+            pares_mas_comunes,
+            tripletas_mas_comunes,
+            numeros_repetidos_entre_sorteos,
+            combinaciones_completas_mas_comunes,
+            co_ocurrencia_de_numeros,
+            numeros_que_no_han_salido,
+            co_ocurrencias_del_numero_mas_frecuente,
+            generar_jugadas_por_patrones_determinista,
+            generar_ticket_estrategia_15,
+            ticket_ya_salio,
+            tabla_de_horizontes,
+            ranking_de_ausencias,
+        )
         print("\nAnálisis disponibles:")
         print("1. Números más frecuentes")
         print("2. Números menos frecuentes")
@@ -78,6 +71,9 @@ def menu():
         print("13. Números que más co-ocurren con el número más frecuente")
         print("14. Generar jugadas óptimas")
         print("15. Generar 1 ticket (Estrategia 15)")
+        print("16. Consultar si un ticket ya salió")
+        print("17. Generar lote de tickets")
+        print("18. Backtest de las estrategias sobre el historial")
         sub_opcion = input("Seleccione una opción: ")
 
         if sub_opcion == "1":
@@ -122,8 +118,19 @@ def menu():
                 for comp, veces in compañeros:
                     print(f"  - {comp}: {veces} veces")
         elif sub_opcion == "12":
+            respuesta = input("¿Cuántos sorteos recientes quieres analizar? (Enter = todos los horizontes): ")
+            if not respuesta.strip():
+                print("\nNúmeros fríos por horizonte (últimos N sorteos):")
+                for fila in tabla_de_horizontes(file_path):
+                    rango = f"N = {fila['desde']}" if fila["desde"] == fila["hasta"] else \
+                        f"N = {fila['desde']}-{fila['hasta'] if fila['hasta'] else '∞'}"
+                    print(f"  {rango}: {', '.join(map(str, fila['numeros']))}")
+                print("\nAusencia actual de cada número:")
+                for numero, gap in ranking_de_ausencias(file_path):
+                    print(f"  - Número {numero}: {'nunca ha salido' if gap is None else f'{gap} sorteos sin salir'}")
+                return
             try:
-                ultimos = int(input("¿Cuántos sorteos recientes quieres analizar?: "))
+                ultimos = int(respuesta)
             except ValueError:
                 print("Número inválido.")
                 return
@@ -148,9 +155,68 @@ def menu():
             for jugada in jugadas_optimas:
                 print(jugada)
         elif sub_opcion == "15":
-            ticket = generar_ticket_estrategia_15(file_path)
-            print("\nTicket (Estrategia 15):")
-            print(ticket)
+            tickets = generar_ticket_estrategia_15(file_path)
+            # línea base: los mismos tickets frente a tickets al azar sobre el historial
+            from simulacion import imprimir_comparacion
+            imprimir_comparacion(file_path, tickets)
+        elif sub_opcion == "16":
+            try:
+                ticket = [int(n) for n in input("Ingresa los 5 números del ticket: ").replace(",", " ").split()]
+            except ValueError:
+                print("Número inválido.")
+                return
+            if len(ticket) != 5 or len(set(ticket)) != 5 or not all(1 <= n <= 39 for n in ticket):
+                print("El ticket debe tener 5 números distintos entre 1 y 39.")
+                return
+            sorteos = ticket_ya_salio(file_path, ticket)
+            if sorteos:
+                print(f"{sorted(ticket)} salió en los sorteos: {', '.join(map(str, sorteos))}")
+            else:
+                print(f"{sorted(ticket)} nunca ha salido.")
+        elif sub_opcion == "17":
+            from lotes import ESTRATEGIAS, generar_lote
+            for i, nombre in enumerate(ESTRATEGIAS, start=1):
+                print(f"{i}. {nombre}")
+            try:
+                opcion = int(input("Seleccione una estrategia: "))
+            except ValueError:
+                print("Número inválido.")
+                return
+            if not 1 <= opcion <= len(ESTRATEGIAS):
+                print("Opción no válida.")
+                return
+            estrategia = ESTRATEGIAS[opcion - 1]
+            try:
+                cantidad = int(input("¿Cuántos tickets deseas generar?: "))
+            except ValueError:
+                print("Número inválido.")
+                return
+            inicio = time.perf_counter()
+            try:
+                tickets = generar_lote(file_path, estrategia, cantidad)
+            except ValueError as e:
+                print(e)
+                return
+            duracion = time.perf_counter() - inicio
+            for ticket in tickets:
+                print(ticket)
+            if len(tickets) < cantidad:
+                print(f"La estrategia solo produjo {len(tickets)} tickets distintos.")
+            print(f"{len(tickets)} tickets en {duracion:.2f} s ({len(tickets) / duracion:.0f} tickets/s).")
+        elif sub_opcion == "18":
+            from backtest import SORTEOS_INICIALES, backtest, imprimir_resultados
+            try:
+                respuesta = input(f"¿Desde qué sorteo empezar a jugar? (Enter = {SORTEOS_INICIALES}): ")
+                desde = int(respuesta) if respuesta.strip() else SORTEOS_INICIALES
+                respuesta = input("¿Cuántas semillas por estrategia? (Enter = 1): ")
+                cantidad_semillas = int(respuesta) if respuesta.strip() else 1
+            except ValueError:
+                print("Número inválido.")
+                return
+            inicio = time.perf_counter()
+            resultados = backtest(file_path, semillas=range(cantidad_semillas), desde=desde)
+            imprimir_resultados(resultados)
+            print(f"Backtest en {time.perf_counter() - inicio:.2f} s.")
         else:
             print("Opción no válida.")
     elif opcion == "3":
@@ -159,9 +225,151 @@ def menu():
     elif opcion == "4":
         print("Saliendo del programa...")
         return
+    elif opcion == "5":
+        from vigilancia import vigilar
+        vigilar(file_path, url_main, url_base, **opciones)
+
+# analyze <nombre>: función de analisis y parámetros que acepta
+ANALISIS = {
+    "frecuentes": ("numeros_mas_frecuentes", ()),
+    "menos-frecuentes": ("numeros_menos_frecuentes", ()),
+    "promedio": ("promedio_por_sorteo", ()),
+    "diferencia": ("diferencia_mayor_menor", ()),
+    "paridad": ("conteo_pares_impares", ()),
+    "rangos": ("conteo_por_rangos", ()),
+    "pares": ("pares_mas_comunes", ()),
+    "tripletas": ("tripletas_mas_comunes", ()),
+    "repeticiones": ("numeros_repetidos_entre_sorteos", ()),
+    "combinaciones": ("combinaciones_completas_mas_comunes", ()),
+    "coocurrencia": ("co_ocurrencia_de_numeros", ()),
+    "coocurrencia-principal": ("co_ocurrencias_del_numero_mas_frecuente", ()),
+    "frios": ("numeros_que_no_han_salido", ("ultimos",)),
+    "horizontes": ("tabla_de_horizontes", ()),
+    "ausencias": ("ranking_de_ausencias", ()),
+    "ranking": ("ranking_de_numeros", ()),
+    "ranking-correlacion": ("ranking_de_numeros_correlacion_prioritaria", ()),
+    "coincidencias": ("coincidencias_con_historial", ("ticket",)),
+    "ya-salio": ("ticket_ya_salio", ("ticket",)),
+}
+
+def _a_json(valor):
+    # numpy y tuplas de los análisis -> tipos de JSON
+    if isinstance(valor, dict):
+        return {str(k): _a_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, set)):
+        return [_a_json(v) for v in valor]
+    if hasattr(valor, "tolist"):
+        return valor.tolist()
+    return valor
+
+def _imprimir(resultado, como_json=False):
+    if como_json:
+        print(json.dumps(_a_json(resultado), ensure_ascii=False))
+    elif isinstance(resultado, dict):
+        for clave, valor in resultado.items():
+            print(f"{clave}: {valor}")
+    elif isinstance(resultado, (list, tuple)):
+        for fila in resultado:
+            if isinstance(fila, tuple) and len(fila) == 2:
+                print(f"{fila[0]}: {fila[1]}")
+            else:
+                print(fila)
+    else:
+        print(resultado)
+
+def comando_sync(args):
+    url_main, url_base, opciones = configuracion()
+    if args.concurrencia:
+        opciones["concurrencia"] = args.concurrencia
+    if args.vigilar:
+        from vigilancia import vigilar
+        vigilar(args.archivo, url_main, url_base, **opciones)
+    elif args.desde_cache:
+        from sincronizacion import reconstruir_desde_cache
+        reconstruir_desde_cache(args.archivo, url_base)
+    else:
+        from sincronizacion import sincronizar
+        sincronizar(args.archivo, url_main, url_base, **opciones)
+    return 0
+
+def comando_analyze(args):
+    import analisis
+    nombre, parametros = ANALISIS[args.nombre]
+    valores = {"ultimos": args.ultimos, "ticket": args.ticket}
+    faltantes = [p for p in parametros if valores[p] is None]
+    if faltantes:
+        print(f"El análisis '{args.nombre}' requiere --{faltantes[0]}.", file=sys.stderr)
+        return 2
+    if args.ticket is not None and (len(set(args.ticket)) != 5 or not all(1 <= n <= 39 for n in args.ticket)):
+        print("El ticket debe tener 5 números distintos entre 1 y 39.", file=sys.stderr)
+        return 2
+    resultado = getattr(analisis, nombre)(args.archivo, *(valores[p] for p in parametros))
+    if args.nombre == "ya-salio" and not resultado and not args.json:
+        # sin salida no se distinguiría de un fallo
+        print(f"{sorted(args.ticket)} nunca ha salido.")
+        return 0
+    _imprimir(resultado, args.json)
+    return 0
+
+def comando_ticket(args):
+    from lotes import generar_lote
+    try:
+        tickets = generar_lote(args.archivo, args.estrategia, args.count, args.procesos)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.json:
+        _imprimir(tickets, True)
+    else:
+        for ticket in tickets:
+            print(" ".join(map(str, ticket)))
+    if len(tickets) < args.count:
+        print(f"La estrategia solo produjo {len(tickets)} tickets distintos.", file=sys.stderr)
+    return 0
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Scraper y análisis de MiLoto. Sin comando abre el menú interactivo.")
+    parser.add_argument("--archivo", default=FILE_PATH, help="historial de sorteos (por defecto %(default)s)")
+    comandos = parser.add_subparsers(dest="comando", metavar="comando")
+
+    sync = comandos.add_parser("sync", help="descarga los sorteos nuevos")
+    sync.add_argument("--concurrencia", type=int, help="conexiones simultáneas")
+    modo = sync.add_mutually_exclusive_group()
+    modo.add_argument("--vigilar", action="store_true",
+                      help="queda corriendo y sincroniza alrededor de cada sorteo")
+    modo.add_argument("--desde-cache", action="store_true",
+                      help="vuelve a parsear las páginas en caché y agrega los sorteos que falten, sin red")
+    sync.set_defaults(funcion=comando_sync)
+
+    analyze = comandos.add_parser("analyze", help="imprime un análisis del historial")
+    analyze.add_argument("nombre", choices=sorted(ANALISIS), metavar="nombre",
+                         help=", ".join(sorted(ANALISIS)))
+    analyze.add_argument("--ultimos", type=int, help="sorteos recientes a considerar (frios)")
+    analyze.add_argument("--ticket", type=int, nargs=5, metavar="N", help="ticket a consultar")
+    analyze.add_argument("--json", action="store_true", help="salida en JSON")
+    analyze.set_defaults(funcion=comando_analyze)
+
+    ticket = comandos.add_parser("ticket", help="genera tickets con una estrategia")
+    # los nombres válidos están en lotes.ESTRATEGIAS; se validan al generar
+    # para no importar numpy solo para armar la ayuda
+    ticket.add_argument("estrategia", help="15_old, 15_new, optimas_v2 o patrones")
+    ticket.add_argument("--count", type=int, default=1, help="cantidad de tickets (por defecto %(default)s)")
+    ticket.add_argument("--procesos", type=int, help="procesos para generar (por defecto, uno por CPU)")
+    ticket.add_argument("--json", action="store_true", help="salida en JSON")
+    ticket.set_defaults(funcion=comando_ticket)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    # solo se comprueba que exista: leer el historial entero costaría más
+    # que el análisis; su contenido lo validan los cargadores
+    if not os.path.exists(args.archivo):
+        crear_json_vacio(args.archivo)
+    if args.comando is None:
+        menu(args.archivo)
+        return 0
+    return args.funcion(args)
 
 if __name__ == "__main__":
-    file_path = "resultados.json"
-    if not revisar_json(file_path):
-        crear_json_vacio(file_path)
-    menu()
+    sys.exit(main())
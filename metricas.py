@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+import atexit
+import inspect
+import functools
+import threading
+
+# Instrumentación de las etapas calientes (descarga, parseo, JSON, análisis,
+# generación de tickets). Se activa con MILOTO_METRICAS=1; apagada, medir()
+# devuelve la función original y etapa() un contexto vacío compartido, así
+# que no agrega trabajo en el camino normal. Al salir se imprime un resumen
+# por stderr (para no mezclarse con la salida --json de la CLI) y se escribe
+# un archivo en formato de texto de Prometheus (ruta en MILOTO_METRICAS_PROM)
+# para el textfile collector del node exporter.
+ACTIVO = os.environ.get("MILOTO_METRICAS", "").strip().lower() not in ("", "0", "no", "false")
+RUTA_PROMETHEUS = os.environ.get("MILOTO_METRICAS_PROM", "miloto.prom")
+
+_etapas = {}                  # nombre -> [llamadas, segundos, bytes]
+_lock = threading.Lock()      # las descargas se registran desde varios hilos
+
+def registrar(nombre, segundos, bytes=0):
+    with _lock:
+        etapa = _etapas.setdefault(nombre, [0, 0.0, 0])
+        etapa[0] += 1
+        etapa[1] += segundos
+        etapa[2] += bytes
+
+def medir(nombre, bytes=None):
+    """
+    Decorador que cronometra cada llamada bajo la etapa `nombre`. `bytes`,
+    si se da, recibe (resultado, *args) y devuelve los bytes procesados.
+    """
+    def decorador(funcion):
+        if not ACTIVO:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion(*args, **kwargs)
+            except BaseException:
+                registrar(nombre, time.perf_counter() - inicio)
+                raise
+            registrar(nombre, time.perf_counter() - inicio, bytes(resultado, *args) if bytes else 0)
+            return resultado
+        return envoltura
+    return decorador
+
+class _Etapa:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.bytes = 0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nombre, time.perf_counter() - self.inicio, self.bytes)
+        return False
+
+class _EtapaNula:
+    bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULA = _EtapaNula()
+
+def etapa(nombre):
+    """Contexto para cronometrar un bloque; asignar .bytes dentro del bloque si aplica."""
+    return _Etapa(nombre) if ACTIVO else _NULA
+
+def instrumentar_modulo(espacio, prefijo):
+    """
+    Envuelve con medir() cada función pública del módulo cuyo primer
+    parámetro sea file_path (los análisis del menú). Se llama al final del
+    módulo con globals().
+    """
+    if not ACTIVO:
+        return
+    for nombre, objeto in list(espacio.items()):
+        if nombre.startswith("_") or not inspect.isfunction(objeto):
+            continue
+        if objeto.__module__ != espacio["__name__"]:
+            continue
+        parametros = list(inspect.signature(objeto).parameters)
+        if parametros[:1] == ["file_path"]:
+            espacio[nombre] = medir(f"{prefijo}.{nombre}")(objeto)
+
+def resumen():
+    with _lock:
+        return {nombre: {"llamadas": e[0], "segundos": e[1], "bytes": e[2]} for nombre, e in _etapas.items()}
+
+def imprimir_resumen():
+    etapas = sorted(resumen().items(), key=lambda x: x[1]["segundos"], reverse=True)
+    if not etapas:
+        return
+    print(f"\n{'Etapa':<50}{'Llamadas':>10}{'Total ms':>12}{'Media ms':>11}{'Bytes':>14}", file=sys.stderr)
+    for nombre, e in etapas:
+        print(f"{nombre:<50}{e['llamadas']:>10}{e['segundos'] * 1000:>12.2f}"
+              f"{e['segundos'] * 1000 / e['llamadas']:>11.3f}{e['bytes']:>14}", file=sys.stderr)
+
+def texto_prometheus():
+    etapas = sorted(resumen().items())
+    lineas = []
+    for metrica, campo, ayuda in (
+        ("miloto_etapa_llamadas_total", "llamadas", "Llamadas por etapa."),
+        ("miloto_etapa_segundos_total", "segundos", "Tiempo de reloj acumulado por etapa, en segundos."),
+        ("miloto_etapa_bytes_total", "bytes", "Bytes procesados por etapa."),
+    ):
+        lineas.append(f"# HELP {metrica} {ayuda}")
+        lineas.append(f"# TYPE {metrica} counter")
+        for nombre, e in etapas:
+            etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+            lineas.append(f'{metrica}{{etapa="{etiqueta}"}} {e[campo]}')
+    return "\n".join(lineas) + "\n"
+
+def escribir_prometheus(ruta=None):
+    # el textfile collector puede leer en cualquier momento: temporal + rename
+    ruta = ruta or RUTA_PROMETHEUS
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as file:
+        file.write(texto_prometheus())
+    os.replace(tmp, ruta)
+
+def _al_salir():
+    if not _etapas:
+        return
+    imprimir_resumen()
+    try:
+        escribir_prometheus()
+    except OSError as e:
+        print(f"No se pudieron escribir las métricas en {RUTA_PROMETHEUS}: {e}", file=sys.stderr)
+
+if ACTIVO:
+    atexit.register(_al_salir)
@@ -0,0 +1,166 @@
+import re
+from html.parser import HTMLParser
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Parser dedicado para las páginas de sorteos. Solo mira los seis elementos
+# que interesan (número, fecha, día, balotas, acumulado y ganadores) sin
+# construir el árbol completo: con lxml si está instalado y, si no, con un
+# tokenizador sobre html.parser que va juntando el texto de esos elementos a
+# medida que los recorre. Replica lo que hacía la versión con BeautifulSoup:
+# primer elemento que cumple cada regla (todas las balotas), AttributeError
+# si falta alguno y ValueError si un número no se puede leer.
+PATRON_SORTEO = re.compile(r'^SORTEO #\d+$')
+TROZO = 2048                 # caracteres por lectura al buscar solo el número
+
+def _clases(valor):
+    return (valor or "").split()
+
+# (campo, etiqueta, regla sobre la lista de clases); las reglas con espacios
+# exigen el atributo completo, igual que class_="a b" en BeautifulSoup
+REGLAS = (
+    ("fecha", "div", lambda c: "fs-5" in c),
+    ("dia", "div", lambda c: "fs-2" in c),
+    ("balotas", "div", lambda c: "yellow-ball" in c),
+    ("acumulado", "div", lambda c: c == ["results-accumulated-number", "shadow-inner"]),
+    ("ganadores", "div", lambda c: c == ["fs-2", "pink-light"]),
+)
+
+def _decodificar(html):
+    if isinstance(html, str):
+        return html
+    try:
+        return html.decode("utf-8")
+    except UnicodeDecodeError:
+        # solo para páginas que no vienen en UTF-8: bs4 tarda en importarse
+        from bs4 import UnicodeDammit
+        return UnicodeDammit(html).unicode_markup
+
+class _Captura:
+    __slots__ = ("campo", "etiqueta", "profundidad", "partes", "con_hijos")
+
+    def __init__(self, campo, etiqueta):
+        self.campo = campo
+        self.etiqueta = etiqueta
+        self.profundidad = 1
+        self.partes = []
+        self.con_hijos = False
+
+class _Tokenizador(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.textos = {}              # campo -> texto del primer elemento
+        self.balotas = []
+        self.capturas = []
+
+    def handle_starttag(self, tag, attrs):
+        for captura in self.capturas:
+            captura.con_hijos = True
+            if tag == captura.etiqueta:
+                captura.profundidad += 1
+
+        if tag == "strong" and "numero" not in self.textos:
+            self.capturas.append(_Captura("numero", tag))
+        elif tag == "div":
+            clases = None
+            for campo, _, regla in REGLAS:
+                if campo in self.textos:
+                    continue
+                if clases is None:
+                    clases = _clases(dict(attrs).get("class"))
+                if regla(clases):
+                    self.capturas.append(_Captura(campo, tag))
+
+    def handle_endtag(self, tag):
+        for captura in list(self.capturas):
+            if tag != captura.etiqueta:
+                continue
+            captura.profundidad -= 1
+            if captura.profundidad == 0:
+                self.capturas.remove(captura)
+                self._cerrar(captura)
+
+    def handle_data(self, data):
+        for captura in self.capturas:
+            captura.partes.append(data)
+
+    def _cerrar(self, captura):
+        texto = "".join(captura.partes)
+        if captura.campo == "numero":
+            # como string=...: solo un <strong> con un único texto y que calce
+            if not captura.con_hijos and PATRON_SORTEO.search(texto):
+                self.textos["numero"] = texto
+        elif captura.campo == "balotas":
+            self.balotas.append(texto)
+        elif captura.campo not in self.textos:
+            self.textos[captura.campo] = texto
+
+def _textos_tokenizador(html, solo_numero=False):
+    tokenizador = _Tokenizador()
+    texto = _decodificar(html)
+    if solo_numero:
+        # para el índice basta el número: el resto de reglas ya se da por
+        # visto y se deja de leer en cuanto aparece
+        tokenizador.textos.update({campo: None for campo, _, _ in REGLAS})
+        for inicio in range(0, len(texto), TROZO):
+            tokenizador.feed(texto[inicio:inicio + TROZO])
+            if tokenizador.textos.get("numero") is not None:
+                return tokenizador.textos, tokenizador.balotas
+    else:
+        tokenizador.feed(texto)
+    tokenizador.close()
+    return tokenizador.textos, tokenizador.balotas
+
+def _textos_lxml(html, solo_numero=False):
+    try:
+        raiz = lxml.html.fromstring(_decodificar(html))
+    except lxml.etree.ParserError:
+        # documento vacío: igual que una página sin los elementos
+        return {}, []
+    textos = {}
+    for strong in raiz.iter("strong"):
+        if len(strong) == 0 and strong.text and PATRON_SORTEO.search(strong.text):
+            textos["numero"] = strong.text
+            break
+    balotas = []
+    if not solo_numero:
+        for div in raiz.iter("div"):
+            clases = _clases(div.get("class"))
+            for campo, _, regla in REGLAS:
+                if regla(clases):
+                    if campo == "balotas":
+                        balotas.append(div.text_content())
+                    elif campo not in textos:
+                        textos[campo] = div.text_content()
+    return textos, balotas
+
+def _textos(html, solo_numero=False):
+    if lxml is not None:
+        return _textos_lxml(html, solo_numero)
+    return _textos_tokenizador(html, solo_numero)
+
+def _campo(textos, campo):
+    if textos.get(campo) is None:
+        raise AttributeError(f"La página no tiene el elemento '{campo}'.")
+    return textos[campo].strip()
+
+def parsear_total(html):
+    textos, _ = _textos(html, solo_numero=True)
+    if textos.get("numero") is None:
+        return None
+    return int(re.search(r'\d+', textos["numero"]).group())
+
+def parsear_sorteo(html):
+    textos, balotas = _textos(html)
+    return {
+        "numero": int(re.search(r'\d+', _campo(textos, "numero")).group()),
+        "fecha": _campo(textos, "fecha"),
+        "dia": _campo(textos, "dia"),
+        "balotas": [int(b.strip()) for b in balotas],
+        "acumulado": int(_campo(textos, "acumulado").replace('$', '').replace('.', '')) * 1_000_000,
+        "total_ganadores": int(_campo(textos, "ganadores").replace('.', '')),
+    }
@@ -0,0 +1,184 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import requests
+from metricas import etapa
+
+# Planificador de peticiones HTTP para el scraping. Se usa como una sesión
+# (expone get()) y por cada host combina:
+#   - un token bucket que limita la tasa de peticiones por segundo,
+#   - un límite de peticiones en vuelo ajustado con AIMD: tras un arranque
+#     lento sube de a una por ronda sin errores y se reduce a la mitad ante
+#     una señal de congestión (429/5xx, timeout, error de conexión o
+#     latencia muy por encima de la mínima observada); la tasa del bucket
+#     se ajusta igual,
+#   - reintentos con backoff exponencial con jitter completo y respeto de
+#     Retry-After, que además pausa a todo el host hasta el momento indicado.
+# Los 404 y demás respuestas no reintentables se devuelven tal cual.
+TASA_INICIAL = 10.0           # peticiones por segundo al arrancar
+TASA_MINIMA = 0.5
+TASA_MAXIMA = 200.0
+SUMA_TASA = 2.0               # req/s que gana la tasa por cada segundo sin errores
+RAFAGA = 4                    # capacidad del bucket
+LIMITE_INICIAL = 2            # peticiones en vuelo al arrancar (crece hasta `concurrencia`)
+FACTOR_LATENCIA = 4.0         # latencia > FACTOR × mínima cuenta como congestión
+LATENCIA_MINIMA_SEÑAL = 0.2   # ...siempre que supere estos segundos
+REINTENTOS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAXIMO = 30.0
+RETRY_AFTER_MAXIMO = 300.0
+TIMEOUT = (5, 30)             # (conexión, lectura) en segundos
+REINTENTABLES = {429, 500, 502, 503, 504}
+# errores de red que se reintentan; una respuesta cortada a mitad de cuerpo
+# también se vuelve a pedir
+REINTENTABLES_RED = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+def backoff(intento, base=BACKOFF_BASE, maximo=BACKOFF_MAXIMO):
+    """Espera antes del reintento `intento` (0, 1, ...): jitter completo sobre base·2^intento."""
+    return random.uniform(0, min(maximo, base * 2 ** intento))
+
+def retry_after(respuesta):
+    """Segundos indicados por Retry-After (entero o fecha HTTP), o None."""
+    valor = respuesta.headers.get("Retry-After")
+    if not valor:
+        return None
+    try:
+        segundos = float(valor)
+    except ValueError:
+        try:
+            fecha = parsedate_to_datetime(valor)
+        except (TypeError, ValueError):
+            return None
+        if fecha.tzinfo is None:
+            fecha = fecha.replace(tzinfo=timezone.utc)
+        segundos = (fecha - datetime.now(timezone.utc)).total_seconds()
+    return min(max(segundos, 0.0), RETRY_AFTER_MAXIMO)
+
+class _Host:
+    def __init__(self, tasa, concurrencia):
+        self.cond = threading.Condition()
+        self.tasa = tasa
+        self.tokens = float(RAFAGA)
+        self.repuesto = time.monotonic()
+        self.limite = float(min(LIMITE_INICIAL, concurrencia))
+        self.maximo = concurrencia
+        self.en_vuelo = 0
+        self.pausa_hasta = 0.0
+        self.latencia_minima = None
+        self.latencia_media = 0.0
+        self.ultimo_recorte = 0.0
+
+    def _reponer(self, ahora):
+        self.tokens = min(RAFAGA, self.tokens + (ahora - self.repuesto) * self.tasa)
+        self.repuesto = ahora
+
+    def adquirir(self):
+        with self.cond:
+            while True:
+                ahora = time.monotonic()
+                self._reponer(ahora)
+                if ahora < self.pausa_hasta:
+                    espera = self.pausa_hasta - ahora
+                elif self.en_vuelo >= int(self.limite):
+                    espera = None            # hasta que termine otra petición
+                elif self.tokens < 1:
+                    espera = (1 - self.tokens) / self.tasa
+                else:
+                    self.tokens -= 1
+                    self.en_vuelo += 1
+                    return
+                self.cond.wait(espera)
+
+    def liberar(self, latencia=None, congestion=False, pausa=None):
+        with self.cond:
+            ahora = time.monotonic()
+            self.en_vuelo -= 1
+            if latencia is not None:
+                self.latencia_media = latencia if not self.latencia_media else 0.8 * self.latencia_media + 0.2 * latencia
+                if not congestion:
+                    if self.latencia_minima is None or latencia < self.latencia_minima:
+                        self.latencia_minima = latencia
+                    congestion = latencia > max(LATENCIA_MINIMA_SEÑAL, FACTOR_LATENCIA * self.latencia_minima)
+            if pausa:
+                self.pausa_hasta = max(self.pausa_hasta, ahora + pausa)
+
+            if congestion:
+                # un solo recorte por ronda: las peticiones que ya estaban en
+                # vuelo cuando empezó la congestión no vuelven a recortar
+                if ahora - self.ultimo_recorte > max(self.latencia_media, 1 / self.tasa):
+                    self.limite = max(1.0, self.limite / 2)
+                    self.tasa = max(TASA_MINIMA, self.tasa / 2)
+                    self.tokens = min(self.tokens, 0.0)
+                    self.ultimo_recorte = ahora
+            elif not self.ultimo_recorte:
+                # arranque lento, como en TCP: hasta la primera congestión
+                # límite y tasa se duplican en cada ronda
+                self.limite = min(self.maximo, self.limite + 1)
+                self.tasa = min(TASA_MAXIMA, self.tasa + 1)
+            else:
+                self.limite = min(self.maximo, self.limite + 1 / self.limite)
+                self.tasa = min(TASA_MAXIMA, self.tasa + SUMA_TASA / self.tasa)
+            self.cond.notify_all()
+
+class Planificador:
+    """
+    Envoltura de una requests.Session con limitación de tasa, control de
+    concurrencia AIMD y reintentos por host. Es segura entre hilos.
+    """
+    def __init__(self, session=None, concurrencia=8, tasa=TASA_INICIAL,
+                 reintentos=REINTENTOS, timeout=TIMEOUT):
+        self.session = session or requests.Session()
+        self.concurrencia = concurrencia
+        self.tasa = tasa
+        self.reintentos = reintentos
+        self.timeout = timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        nombre = urlsplit(url).netloc
+        with self._lock:
+            if nombre not in self._hosts:
+                self._hosts[nombre] = _Host(self.tasa, self.concurrencia)
+            return self._hosts[nombre]
+
+    def estado(self):
+        """{host: {"tasa", "limite", "en_vuelo"}} en este momento."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {nombre: {"tasa": h.tasa, "limite": int(h.limite), "en_vuelo": h.en_vuelo}
+                for nombre, h in hosts.items()}
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        host = self._host(url)
+        for intento in range(self.reintentos + 1):
+            host.adquirir()
+            inicio = time.monotonic()
+            try:
+                respuesta = self.session.get(url, **kwargs)
+            except REINTENTABLES_RED as e:
+                host.liberar(congestion=True)
+                error = e
+            except BaseException:
+                # cualquier otro error (redirecciones, URL inválida...) no se
+                # reintenta, pero el lugar en vuelo siempre se devuelve
+                host.liberar(congestion=True)
+                raise
+            else:
+                if respuesta.status_code not in REINTENTABLES:
+                    host.liberar(time.monotonic() - inicio)
+                    return respuesta
+                pausa = retry_after(respuesta)
+                host.liberar(time.monotonic() - inicio, congestion=True, pausa=pausa)
+                error = requests.HTTPError(f"{respuesta.status_code} al pedir {url}", response=respuesta)
+
+            if intento < self.reintentos:
+                # una pausa por Retry-After la espera adquirir(); el backoff
+                # reparte los reintentos para que no lleguen todos juntos
+                with etapa("http.backoff"):
+                    time.sleep(backoff(intento))
+        raise error
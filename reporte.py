@@ -0,0 +1,98 @@
+import os
+import sys
+import html
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_svg import FigureCanvasSVG
+from almacen import cargar_columnas
+import graficas
+from graficas import SECCIONES, disposicion, estadisticas_de_seccion
+
+# Reporte sin ventana de todas las gráficas del dashboard: un archivo por
+# (sección, gráfica) en PNG o SVG más un index.html que las reúne. El
+# proceso principal calcula el resumen de cada sección una vez y cada
+# gráfica se dibuja en un proceso aparte que solo recibe ese resumen, así
+# que con suficientes procesos el reporte tarda lo que la gráfica más lenta.
+FORMATOS = {"png": FigureCanvasAgg, "svg": FigureCanvasSVG}
+DESTINO_POR_DEFECTO = "reporte"
+
+def _renderizar(nombre, resumen, ruta, formato):
+    inicio = time.perf_counter()
+    figura = getattr(graficas, nombre)(resumen)
+    FORMATOS[formato](figura).print_figure(ruta, format=formato)
+    return time.perf_counter() - inicio
+
+def _indice(file_path, celdas, formato, duracion):
+    partes = [
+        "<!DOCTYPE html>",
+        '<html lang="es"><head><meta charset="utf-8"><title>Reporte MiLoto</title>',
+        "<style>body{font-family:sans-serif;margin:2em}"
+        ".grilla{display:grid;grid-template-columns:repeat(3,1fr);gap:1em}"
+        ".ancha{grid-column:1/-1}img{width:100%}</style></head><body>",
+        "<h1>Reporte MiLoto</h1>",
+        f"<p>Historial: {html.escape(os.path.abspath(file_path))}. "
+        f"Generado el {datetime.now():%Y-%m-%d %H:%M:%S} en {duracion:.2f} s.</p>",
+    ]
+    for clave, meta in SECCIONES.items():
+        partes.append(f"<h2>{html.escape(meta['titulo'])}</h2><div class=\"grilla\">")
+        for nombre, ancho in celdas[clave]:
+            clase = ' class="ancha"' if ancho > 1 else ""
+            partes.append(f'<img{clase} src="{clave}/{nombre}.{formato}" alt="{nombre}">')
+        partes.append("</div>")
+    partes.append("</body></html>")
+    return "\n".join(partes) + "\n"
+
+def generar_reporte(file_path, destino=DESTINO_POR_DEFECTO, formato="png", procesos=None):
+    """
+    Escribe todas las gráficas de todas las secciones en `destino` y
+    devuelve la ruta del index.html.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (usar {', '.join(FORMATOS)}).")
+    inicio = time.perf_counter()
+    columnas = cargar_columnas(file_path)
+
+    tareas = []
+    celdas = {}
+    for clave in SECCIONES:
+        resumen = estadisticas_de_seccion(columnas, clave)
+        os.makedirs(os.path.join(destino, clave), exist_ok=True)
+        celdas[clave] = []
+        for generar, _, _, ancho in disposicion(clave):
+            ruta = os.path.join(destino, clave, f"{generar.__name__}.{formato}")
+            tareas.append((generar.__name__, resumen, ruta, formato))
+            celdas[clave].append((generar.__name__, ancho))
+
+    argumentos = list(zip(*tareas))
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(min(procesos, len(tareas))) as pool:
+            tiempos = list(pool.map(_renderizar, *argumentos))
+    else:
+        tiempos = list(map(_renderizar, *argumentos))
+
+    duracion = time.perf_counter() - inicio
+    indice = os.path.join(destino, "index.html")
+    with open(indice, 'w', encoding="utf-8") as file:
+        file.write(_indice(file_path, celdas, formato, duracion))
+    print(f"{len(tareas)} gráficas en {duracion:.2f} s "
+          f"(la más lenta: {max(tiempos):.2f} s, suma: {sum(tiempos):.2f} s). Índice: {indice}")
+    return indice
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta las gráficas del dashboard sin ventana.")
+    parser.add_argument("archivo", nargs="?", default="resultados.json", help="historial de sorteos")
+    parser.add_argument("--destino", default=DESTINO_POR_DEFECTO, help="directorio del reporte")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="png")
+    parser.add_argument("--procesos", type=int, help="procesos para dibujar (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+    generar_reporte(args.archivo, args.destino, args.formato, args.procesos)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
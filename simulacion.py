@@ -0,0 +1,156 @@
+import os
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from almacen import cargar_columnas, guardar_npz
+from utils import seed_por_archivo, huella_archivo
+from estadisticas import MAX_BALOTA, total_combinaciones, caracteristicas_combinaciones, popcount
+
+# Línea base de Monte Carlo: muchos tickets uniformes de 5 de 39 jugados
+# contra todo el historial. Para cada ticket se cuenta en cuántos sorteos
+# habría acertado 0, 1, ..., 5 balotas; lo que se guarda es el histograma de
+# esos conteos (6 x (sorteos + 1)), que se suma entre procesos sin perder
+# nada y permite sacar medias, percentiles y p-valores exactos.
+# La simulación con la semilla del archivo se guarda en
+# "<archivo>.simulacion.npz" junto con la huella del JSON: mientras el
+# historial no cambie, la comparación del menú no vuelve a simular.
+SIMULACIONES_POR_DEFECTO = 200_000
+TICKETS_POR_TROZO = 20_000
+CELDAS_POR_BLOQUE = 1 << 22       # tickets x sorteos evaluados de una vez
+Z_95 = 1.959963984540054
+VERSION_SIMULACION = 1
+
+_datos_trabajador = {}
+
+def _inicializar(mascaras_sorteos):
+    _datos_trabajador["mascaras"] = mascaras_sorteos
+
+def _simular_trozo(semilla, cantidad):
+    sorteos = _datos_trabajador["mascaras"]
+    n = len(sorteos)
+    rng = np.random.default_rng(semilla)
+    # un rango uniforme en C(39, 5) es un ticket uniforme
+    mascaras_tabla = caracteristicas_combinaciones()["mascara"]
+    histograma = np.zeros((6, n + 1), dtype=np.int64)
+    bloque = max(1, CELDAS_POR_BLOQUE // max(n, 1))
+    fila = np.arange(6)[:, None] * (n + 1)
+
+    for inicio in range(0, cantidad, bloque):
+        b = min(bloque, cantidad - inicio)
+        tickets = mascaras_tabla[rng.integers(0, total_combinaciones(5), size=b)]
+        aciertos = popcount(tickets[:, None] & sorteos[None, :])
+        # conteos[k, t] = sorteos en que el ticket t acertó k balotas
+        conteos = np.stack([np.count_nonzero(aciertos == k, axis=1) for k in range(6)])
+        histograma += np.bincount((conteos + fila).ravel(), minlength=6 * (n + 1)).reshape(6, n + 1)
+    return histograma
+
+def probabilidad_aciertos(k):
+    """Probabilidad exacta (hipergeométrica) de acertar k de 5 con un ticket al azar."""
+    return math.comb(5, k) * math.comb(MAX_BALOTA - 5, 5 - k) / math.comb(MAX_BALOTA, 5)
+
+def simular_tickets_aleatorios(file_path, cantidad=SIMULACIONES_POR_DEFECTO, procesos=None, semilla=None):
+    """
+    Juega `cantidad` tickets al azar contra todo el historial y devuelve el
+    histograma de conteos por cantidad de aciertos, repartiendo el trabajo
+    entre procesos. Cada trozo usa su propio generador derivado de la
+    semilla, así que el resultado no depende de cuántos procesos se usen.
+    """
+    sorteos = np.ascontiguousarray(cargar_columnas(file_path)["mascara"])
+    if semilla is None:
+        semilla = seed_por_archivo(file_path)
+
+    procesos = procesos or os.cpu_count() or 1
+    n_trozos = max(1, math.ceil(cantidad / TICKETS_POR_TROZO))
+    tamaños = [min(TICKETS_POR_TROZO, cantidad - i * TICKETS_POR_TROZO) for i in range(n_trozos)]
+    semillas = np.random.SeedSequence(semilla).spawn(n_trozos)
+
+    if procesos > 1 and n_trozos > 1:
+        with ProcessPoolExecutor(procesos, initializer=_inicializar, initargs=(sorteos,)) as pool:
+            trozos = list(pool.map(_simular_trozo, semillas, tamaños))
+    else:
+        _inicializar(sorteos)
+        trozos = list(map(_simular_trozo, semillas, tamaños))
+
+    return {"tickets": cantidad, "sorteos": len(sorteos), "histograma": sum(trozos)}
+
+def ruta_simulacion(file_path):
+    return f"{os.path.splitext(file_path)[0]}.simulacion.npz"
+
+def _leer_simulacion(file_path):
+    try:
+        with np.load(ruta_simulacion(file_path)) as npz:
+            datos = {k: npz[k] for k in npz.files}
+    except (FileNotFoundError, ValueError, OSError):
+        return None, None
+    # un sidecar de otro formato se trata como desactualizado
+    if datos.pop("version", None) != VERSION_SIMULACION:
+        return None, None
+    simulacion = {"tickets": int(datos["tickets"]), "sorteos": int(datos["sorteos"]),
+                  "histograma": datos["histograma"]}
+    return datos["huella"].tolist(), simulacion
+
+def cargar_simulacion(file_path, cantidad=SIMULACIONES_POR_DEFECTO, procesos=None):
+    """
+    simular_tickets_aleatorios() con la semilla del archivo, reutilizando la
+    guardada si el historial no cambió desde entonces.
+    """
+    huella = huella_archivo(file_path)
+    huella_guardada, simulacion = _leer_simulacion(file_path)
+    if huella_guardada == huella and simulacion["tickets"] == cantidad:
+        return simulacion
+    simulacion = simular_tickets_aleatorios(file_path, cantidad, procesos)
+    guardar_npz(ruta_simulacion(file_path), huella=np.array(huella, dtype=np.int64),
+                version=VERSION_SIMULACION, **simulacion)
+    return simulacion
+
+def resumen_simulacion(simulacion):
+    """
+    Por cada cantidad de aciertos k: media de sorteos con k aciertos por
+    ticket al azar, su intervalo de confianza del 95 %, el rango donde cae
+    el 95 % central de los tickets y el valor esperado exacto.
+    """
+    histograma, n = simulacion["histograma"], simulacion["sorteos"]
+    valores = np.arange(n + 1)
+    filas = []
+    for k in range(6):
+        h = histograma[k]
+        total = h.sum()
+        media = (h * valores).sum() / total
+        desviacion = math.sqrt(max((h * valores ** 2).sum() / total - media ** 2, 0.0))
+        margen = Z_95 * desviacion / math.sqrt(total)
+        acumulado = np.cumsum(h) / total
+        filas.append({
+            "aciertos": k,
+            "media": media,
+            "intervalo_media": (media - margen, media + margen),
+            "percentiles": (int(np.searchsorted(acumulado, 0.025)), int(np.searchsorted(acumulado, 0.975))),
+            "esperado": probabilidad_aciertos(k) * n,
+        })
+    return filas
+
+def p_valor(simulacion, k, conteo):
+    """Fracción de tickets al azar con al menos `conteo` sorteos de k aciertos."""
+    h = simulacion["histograma"][k]
+    return float(h[min(conteo, len(h)):].sum() / h.sum())
+
+def imprimir_comparacion(file_path, tickets, simulacion=None):
+    """Muestra los tickets de una estrategia junto a la línea base al azar."""
+    from analisis import coincidencias_con_historial
+
+    if simulacion is None:
+        simulacion = cargar_simulacion(file_path)
+    coincidencias = {nombre: coincidencias_con_historial(file_path, t) for nombre, t in tickets.items()}
+
+    print(f"\nSorteos con k aciertos en {simulacion['sorteos']} sorteos "
+          f"(azar: {simulacion['tickets']} tickets)")
+    encabezado = f"{'k':>2}" + "".join(f"{nombre:>16}" for nombre in tickets)
+    print(encabezado + f"{'Azar (media)':>15}{'IC 95%':>24}{'95% tickets':>14}{'Esperado':>10}")
+    for fila in resumen_simulacion(simulacion):
+        k = fila["aciertos"]
+        celdas = "".join(
+            f"{c[k]:>7} (p={p_valor(simulacion, k, c[k]):.2f})" for c in coincidencias.values()
+        )
+        bajo, alto = fila["intervalo_media"]
+        p_bajo, p_alto = fila["percentiles"]
+        print(f"{k:>2}{celdas}{fila['media']:>15.3f}{f'[{bajo:.3f}, {alto:.3f}]':>24}"
+              f"{f'{p_bajo}-{p_alto}':>14}{fila['esperado']:>10.3f}")
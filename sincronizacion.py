@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import numpy as np
+from datetime import datetime
+from utils import guardar_json, huella_archivo
+from planificador import Planificador
+from almacen import cargar_columnas
+from extractor import (
+    CONCURRENCIA_POR_DEFECTO,
+    COMPACTAR_CADA,
+    DIRECTORIO_CACHE,
+    crear_sesion,
+    get_total_sorteos,
+    get_sorteos_existentes,
+    descargar_sorteos,
+    update_json_file,
+    leer_journal,
+    compactar_journal,
+    sorteos_en_cache,
+)
+
+# Estado persistente de la sincronización ("<archivo>.sync.json"):
+#   ultimo      mayor número ya procesado: todo lo que está por debajo está
+#               guardado o figura en pendientes
+#   contiguo    mayor N con 1..N guardados
+#   pendientes  {numero: intentos} de los sorteos que faltan o fallaron
+#   en_curso    punto de control de una sincronización sin terminar
+#   huella      huella del JSON cuando se guardó el estado
+# Con él, una actualización normal solo pide el índice y los sorteos nuevos,
+# y una sincronización interrumpida sigue desde el último punto de control.
+MAX_REINTENTOS = 5
+
+def ruta_estado(file_path):
+    return f"{os.path.splitext(file_path)[0]}.sync.json"
+
+def _leer_estado(file_path):
+    try:
+        with open(ruta_estado(file_path), 'r') as file:
+            estado = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    estado["pendientes"] = {int(n): i for n, i in estado.get("pendientes", {}).items()}
+    return estado
+
+def _estado_desde_historial(file_path):
+    # sin estado válido: se deduce una vez de los números ya guardados
+    numeros = np.unique(np.asarray(cargar_columnas(file_path)["numero"]))
+    ultimo = int(numeros[-1]) if len(numeros) else 0
+    huecos = np.setdiff1d(np.arange(1, ultimo + 1), numeros)
+    return {"ultimo": ultimo, "pendientes": {int(n): 0 for n in huecos}, "en_curso": None}
+
+def guardar_estado(estado, file_path):
+    pendientes = estado["pendientes"]
+    estado["contiguo"] = min(pendientes) - 1 if pendientes else estado["ultimo"]
+    estado["huella"] = huella_archivo(file_path)
+    guardar_json(
+        dict(estado, pendientes={str(n): i for n, i in sorted(pendientes.items())}),
+        ruta_estado(file_path),
+    )
+
+def cargar_estado(file_path):
+    """
+    Estado de la sincronización, recuperando antes lo que haya quedado en el
+    journal de una corrida interrumpida.
+    """
+    estado = _leer_estado(file_path)
+    recuperados = [s["numero"] for s in leer_journal(file_path)]
+    huella_previa = huella_archivo(file_path)
+    if recuperados:
+        compactar_journal(file_path)
+        print(f"Recuperados {len(recuperados)} sorteos de una sincronización anterior.")
+
+    if estado is None or estado.get("huella") != huella_previa:
+        estado = _estado_desde_historial(file_path)
+    else:
+        for n in recuperados:
+            estado["pendientes"].pop(n, None)
+    estado["recuperados"] = set(recuperados)
+    return estado
+
+def ultimo_procesado(file_path):
+    """Mayor número ya procesado según el estado guardado (0 si no hay estado)."""
+    estado = _leer_estado(file_path)
+    return estado["ultimo"] if estado else 0
+
+def _se_reintenta(numero, intentos, sin_tope_desde):
+    return intentos < MAX_REINTENTOS or (sin_tope_desde is not None and numero >= sin_tope_desde)
+
+def reintentables(file_path, sin_tope_desde=None):
+    """Sorteos pendientes que la próxima sincronización volvería a pedir."""
+    estado = _leer_estado(file_path)
+    if not estado:
+        return []
+    return sorted(n for n, i in estado["pendientes"].items() if _se_reintenta(n, i, sin_tope_desde))
+
+def sincronizar(file_path, url_main, url_base, concurrencia=CONCURRENCIA_POR_DEFECTO, cache=DIRECTORIO_CACHE,
+                session=None, total=None, sin_tope_desde=None):
+    """
+    Descarga los sorteos nuevos y reintenta los pendientes con menos de
+    MAX_REINTENTOS intentos; los de número >= `sin_tope_desde` se
+    reintentan siempre. Si ya se conoce el total publicado (modo
+    vigilancia) no se vuelve a pedir el índice. Devuelve cuántos sorteos
+    se guardaron.
+    """
+    session = session or crear_sesion(concurrencia)
+
+    if total is None:
+        print("Obteniendo el total de sorteos disponibles...")
+        total = get_total_sorteos(url_main, session, cache)
+
+    if not total:
+        print("No se pudo obtener el número total de sorteos.")
+        return 0
+
+    print(f"Total de sorteos en línea: {total}")
+    estado = cargar_estado(file_path)
+    recuperados = estado.pop("recuperados")
+    if estado.get("en_curso"):
+        print(f"Retomando la sincronización desde el sorteo #{estado['ultimo'] + 1}.")
+    print(f"Sorteos guardados sin huecos hasta el #{estado.get('contiguo', estado['ultimo'])}.")
+
+    reintentos = sorted(n for n, i in estado["pendientes"].items() if _se_reintenta(n, i, sin_tope_desde) and n <= total)
+    nuevos = [n for n in range(estado["ultimo"] + 1, total + 1) if n not in recuperados]
+    faltantes = reintentos + nuevos
+    descartados = len(estado["pendientes"]) - len(reintentos)
+
+    if not faltantes:
+        estado["ultimo"] = max(estado["ultimo"], total)
+        estado["en_curso"] = None
+        guardar_estado(estado, file_path)
+        print("Todos los sorteos están actualizados.")
+        if descartados:
+            print(f"{descartados} sorteos siguen sin poder descargarse tras {MAX_REINTENTOS} intentos.")
+        return 0
+
+    print(f"Sorteos nuevos: {len(nuevos)}; reintentos de sorteos pendientes: {len(reintentos)}.")
+    print(f"Descargando con {concurrencia} conexiones concurrentes...")
+
+    estado["en_curso"] = {"total": total, "inicio": datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    guardar_estado(estado, file_path)
+
+    def punto_de_control():
+        # el journal se vuelca antes de guardar el estado: todo lo que el
+        # estado da por procesado ya está en el historial o en pendientes
+        compactar_journal(file_path)
+        guardar_estado(estado, file_path)
+
+    guardados = procesados = 0
+    inicio = time.perf_counter()
+    try:
+        for i, sorteo in descargar_sorteos(faltantes, url_base, concurrencia, session, cache):
+            if sorteo:
+                update_json_file(sorteo, file_path)
+                estado["pendientes"].pop(i, None)
+                guardados += 1
+                print(f"Sorteo #{i} guardado.")
+            else:
+                estado["pendientes"][i] = estado["pendientes"].get(i, 0) + 1
+                print(f"No se pudo obtener el sorteo #{i}. Probablemente ya no exista o hubo un error.")
+            # los números se procesan en orden: todo hasta i ya quedó resuelto
+            estado["ultimo"] = max(estado["ultimo"], i)
+            procesados += 1
+            if procesados % COMPACTAR_CADA == 0:
+                punto_de_control()
+        estado["en_curso"] = None
+    finally:
+        punto_de_control()
+
+    duracion = time.perf_counter() - inicio
+    velocidad = guardados / duracion if duracion > 0 else 0.0
+    print(f"{guardados}/{len(faltantes)} sorteos en {duracion:.2f} s ({velocidad:.1f} sorteos/s).")
+    if isinstance(session, Planificador):
+        # a qué ritmo terminó ajustándose cada host
+        for host, e in session.estado().items():
+            print(f"  {host}: {e['tasa']:.1f} peticiones/s, hasta {e['limite']} en vuelo.")
+    if estado["pendientes"]:
+        print(f"Sorteos pendientes: {len(estado['pendientes'])} (se reintentarán en la próxima actualización).")
+    return guardados
+
+def reconstruir_desde_cache(file_path, url_base, cache=DIRECTORIO_CACHE):
+    """Vuelve a parsear las páginas guardadas y agrega al historial las que falten, sin red."""
+    existentes = get_sorteos_existentes(file_path)
+    nuevos = [s for s in sorteos_en_cache(url_base, cache) if s["numero"] not in existentes]
+    for sorteo in nuevos:
+        update_json_file(sorteo, file_path)
+    agregados = compactar_journal(file_path)
+    print(f"{agregados} sorteos recuperados desde la caché.")
+    return agregados
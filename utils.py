@@ -1,6 +1,19 @@
+import os
+import re
 import json
+import shutil
 import hashlib
-from datetime import datetime
+import tempfile
+import functools
+from types import MappingProxyType
+from datetime import datetime, date
+from metricas import medir
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+    "noviembre": 11, "diciembre": 12,
+}
 
 def revisar_json(file_path):
     try:
@@ -11,22 +24,104 @@ def revisar_json(file_path):
         return False
 
 def crear_json_vacio(file_path):
-    with open(file_path, 'w') as file:
-        json.dump({
-            "cantidadSorteos": 0,
-            "fechaUltimoSorteo": None,
-            "fechaUltimaConsulta": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "sorteos": []
-        }, file, indent=4)
+    guardar_json({
+        "cantidadSorteos": 0,
+        "fechaUltimoSorteo": None,
+        "fechaUltimaConsulta": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "sorteos": []
+    }, file_path)
+
+# Cache de proceso: un resultado por (función, archivo, argumentos), válido
+# mientras la huella (st_mtime_ns, st_size) del archivo no cambie.
+_cache = {}
+_contadores = {}
+
+def cache_por_archivo(funcion):
+    contador = _contadores.setdefault(funcion.__name__, {"aciertos": 0, "fallos": 0})
+
+    @functools.wraps(funcion)
+    def envoltura(file_path, *args):
+        clave = (funcion.__name__, os.path.abspath(file_path), args)
+        huella = huella_archivo(file_path)
+        guardado = _cache.get(clave)
+        if guardado and guardado[0] == huella:
+            contador["aciertos"] += 1
+            return guardado[1]
+        contador["fallos"] += 1
+        resultado = funcion(file_path, *args)
+        _cache[clave] = (huella, resultado)
+        return resultado
+    return envoltura
+
+def estadisticas_cache():
+    return {nombre: dict(c) for nombre, c in _contadores.items()}
+
+def vaciar_cache():
+    _cache.clear()
+
+def _congelar(objeto):
+    # object_hook: los dicts quedan de solo lectura y sus listas como tuplas
+    return MappingProxyType({k: tuple(v) if isinstance(v, list) else v for k, v in objeto.items()})
 
+def _tamaño(_, file_path):
+    return os.path.getsize(file_path)
+
+@cache_por_archivo
+@medir("json.carga", bytes=_tamaño)
 def cargar_json(file_path):
+    """Instantánea inmutable y compartida del JSON; para modificarlo usar leer_json."""
+    with open(file_path, 'r') as file:
+        return json.load(file, object_hook=_congelar)
+
+@medir("json.carga", bytes=_tamaño)
+def leer_json(file_path):
     with open(file_path, 'r') as file:
         return json.load(file)
 
+@medir("json.guardado", bytes=lambda _, data, file_path: os.path.getsize(file_path))
 def guardar_json(data, file_path):
-    with open(file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+    # escritura atómica: temporal en el mismo directorio + rename, así un
+    # corte a mitad de escritura nunca deja el historial a medias
+    directorio = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, file_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def huella_archivo(file_path):
+    # identifica una versión concreta del archivo sin leerlo
+    st = os.stat(file_path)
+    return [st.st_mtime_ns, st.st_size]
+
+def parsear_fecha(texto):
+    # acepta "05 de agosto de 2024", "2024-08-05" y "05/08/2024"; None si no se reconoce
+    texto = (texto or "").strip().lower()
+    try:
+        m = re.search(r'(\d{1,2})\s+de\s+([a-záéíóú]+)\s+(?:de\s+|del\s+)?(\d{4})', texto)
+        if m and m.group(2) in MESES:
+            return date(int(m.group(3)), MESES[m.group(2)], int(m.group(1)))
+        m = re.search(r'(\d{4})-(\d{1,2})-(\d{1,2})', texto)
+        if m:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        m = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})', texto)
+        if m:
+            return date(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+    except ValueError:
+        pass
+    return None
 
+@cache_por_archivo
 def seed_por_archivo(file_path):
     with open(file_path, "rb") as f:
         h = hashlib.sha256(f.read()).hexdigest()
@@ -0,0 +1,142 @@
+import os
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta, time as hora_del_dia
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import requests
+import numpy as np
+from utils import cargar_json, revisar_json, crear_json_vacio
+from almacen import cargar_columnas, cargar_agregados
+from extractor import CONCURRENCIA_POR_DEFECTO, DIRECTORIO_CACHE, crear_sesion, get_total_sorteos
+from sincronizacion import sincronizar, ultimo_procesado, reintentables
+
+# Modo vigilancia: un proceso de larga duración que mantiene el historial al
+# día sin intervención. Los días de sorteo se deducen de los valores "dia"
+# de los sorteos recientes; cada uno abre una ventana a partir de la hora del
+# sorteo durante la cual se consulta el índice cada INTERVALO_VENTANA
+# segundos (un 304 mientras no cambie, ver cache_html.py). En cuanto aparece
+# el sorteo se descarga, se actualizan los agregados y la ventana se cierra;
+# si su página todavía no estaba lista se reintenta en cada consulta.
+# Fuera de las ventanas solo se hace una consulta de respaldo cada
+# INTERVALO_FUERA segundos, por si el calendario cambia.
+HORA_SORTEO = os.environ.get("MILOTO_HORA_SORTEO", "22:00")    # hora local de la zona
+ZONA = os.environ.get("MILOTO_ZONA", "America/Bogota")
+DURACION_VENTANA = timedelta(hours=4)
+INTERVALO_VENTANA = 30
+INTERVALO_FUERA = 6 * 3600
+ESPERA_ERROR = 60
+SORTEOS_RECIENTES = 60       # sorteos que se miran para deducir el calendario
+PROPORCION_MINIMA = 0.05     # un día cuenta si tiene al menos este porcentaje de ellos
+
+DIAS = {"lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3, "viernes": 4, "sabado": 5, "domingo": 6}
+NOMBRES = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+def _zona():
+    try:
+        return ZoneInfo(ZONA)
+    except ZoneInfoNotFoundError:
+        return None          # hora local del equipo
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", (texto or "").strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+def dias_de_sorteo(file_path):
+    """Días de la semana (0 = lunes) en que se ha sorteado últimamente."""
+    sorteos = cargar_json(file_path).get("sorteos", [])
+    if not sorteos:
+        return set(range(7))
+    numeros = np.asarray(cargar_columnas(file_path)["numero"])
+    recientes = np.argsort(numeros, kind="stable")[-SORTEOS_RECIENTES:]
+    conteo = Counter(DIAS.get(_normalizar(sorteos[i].get("dia"))) for i in recientes)
+    conteo.pop(None, None)
+    dias = {d for d, c in conteo.items() if c >= PROPORCION_MINIMA * len(recientes)}
+    return dias or set(range(7))
+
+def proxima_ventana(ahora, dias, hora=HORA_SORTEO, duracion=DURACION_VENTANA):
+    """(inicio, fin) de la ventana en curso o de la siguiente."""
+    horas, minutos = map(int, hora.split(":"))
+    for desplazamiento in range(-1, 8):
+        fecha = ahora.date() + timedelta(days=desplazamiento)
+        if fecha.weekday() not in dias:
+            continue
+        inicio = datetime.combine(fecha, hora_del_dia(horas, minutos), tzinfo=ahora.tzinfo)
+        if inicio + duracion > ahora:
+            return inicio, inicio + duracion
+    raise ValueError("No hay días de sorteo.")
+
+def _ultimo_guardado(file_path):
+    numeros = np.asarray(cargar_columnas(file_path)["numero"])
+    return int(numeros.max()) if len(numeros) else 0
+
+def _ventana_cumplida(file_path, inicio):
+    # el sorteo de la ventana ya está si el último guardado es de ese día
+    fechas = np.asarray(cargar_columnas(file_path)["fecha"])
+    fechas = fechas[~np.isnat(fechas)]
+    return len(fechas) > 0 and fechas.max() >= np.datetime64(inicio.date())
+
+def _ventana(file_path, dias, zona):
+    """(inicio, fin, abierta): la ventana en curso si su sorteo aún no está guardado, o la siguiente."""
+    ahora = datetime.now(zona)
+    inicio, fin = proxima_ventana(ahora, dias)
+    if inicio <= ahora and _ventana_cumplida(file_path, inicio):
+        inicio, fin = proxima_ventana(fin, dias)
+    return inicio, fin, inicio <= ahora
+
+def _espera(inicio, fin, abierta, zona):
+    if abierta:
+        return INTERVALO_VENTANA, f"en la ventana del sorteo (hasta las {fin:%H:%M})"
+    segundos = (inicio - datetime.now(zona)).total_seconds()
+    return min(segundos, INTERVALO_FUERA), f"próxima ventana: {NOMBRES[inicio.weekday()]} {inicio:%d/%m %H:%M}"
+
+def _registrar(zona, mensaje):
+    print(f"[{datetime.now(zona):%Y-%m-%d %H:%M:%S}] {mensaje}", flush=True)
+
+def vigilar(file_path, url_main, url_base, concurrencia=CONCURRENCIA_POR_DEFECTO, cache=DIRECTORIO_CACHE):
+    """Bucle de sincronización continua; termina con Ctrl+C."""
+    zona = _zona()
+    session = crear_sesion(concurrencia)
+    _registrar(zona, f"Vigilando {url_main} (sorteos a las {HORA_SORTEO}, zona {ZONA if zona else 'local'}).")
+    motivo_anterior = None
+    try:
+        while True:
+            try:
+                total = get_total_sorteos(url_main, session, cache)
+                inicio, fin, abierta = _ventana(file_path, dias_de_sorteo(file_path), zona)
+                # con la ventana abierta, un sorteo posterior al último
+                # guardado que falló (página aún no lista) se reintenta en
+                # cada consulta, sin tope de intentos; los huecos viejos
+                # siguen con el tope normal
+                sin_tope_desde = _ultimo_guardado(file_path) + 1 if abierta else None
+                if total and (total > ultimo_procesado(file_path) or reintentables(file_path, sin_tope_desde)):
+                    guardados = sincronizar(file_path, url_main, url_base, concurrencia, cache, session, total,
+                                            sin_tope_desde)
+                    if guardados:
+                        # columnas y agregados listos para el próximo análisis
+                        cargar_agregados(file_path)
+                        _registrar(zona, f"{guardados} sorteos nuevos; último publicado: #{total}.")
+                        inicio, fin, abierta = _ventana(file_path, dias_de_sorteo(file_path), zona)
+                segundos, motivo = _espera(inicio, fin, abierta, zona)
+                if not total:
+                    segundos = min(segundos, ESPERA_ERROR)
+            except (requests.RequestException, OSError) as e:
+                _registrar(zona, f"Error durante la vigilancia: {e}")
+                segundos, motivo = ESPERA_ERROR, "reintento tras un error"
+            if motivo != motivo_anterior:
+                _registrar(zona, f"Siguiente consulta en {segundos:.0f} s ({motivo}).")
+                motivo_anterior = motivo
+            time.sleep(segundos)
+    except KeyboardInterrupt:
+        _registrar(zona, "Vigilancia detenida.")
+
+if __name__ == "__main__":
+    file_path = "resultados.json"
+    if not revisar_json(file_path):
+        crear_json_vacio(file_path)
+    vigilar(
+        file_path,
+        os.environ.get("MILOTO_URL_MAIN", "https://baloto.com/miloto/resultados/"),
+        os.environ.get("MILOTO_URL_BASE", "https://baloto.com/miloto/resultados-miloto/"),
+        int(os.environ.get("MILOTO_CONCURRENCIA", CONCURRENCIA_POR_DEFECTO)),
+    )